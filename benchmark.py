@@ -0,0 +1,171 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from moteur.plateau import Plateau
+from moteur.joueur import Joueur
+from bots import evaluation
+from bots.table_transposition import TableTranspositionComptée
+from tournoi import créer_bot
+
+# Bots mesurés : (nom, classe, paramètres, profondeur maximale). Les anciens bots sont plafonnés pour que le banc
+# d'essai reste court ; une profondeur maximale de 0 signifie que le bot n'a pas de profondeur (MCTS).
+BOTS = [
+    ("Negamax", "bots.negamax.Negamax", {}, 5),
+    ("Negamax2", "bots.negamaxv2.Negamax2", {}, 7),
+    ("Negamax3", "bots.negamaxv3.Negamax3", {}, 8),
+    ("Negamax4", "bots.negamaxv4.Negamax4", {}, 8),
+    ("Negamax5", "bots.negamaxv5.Negamax5", {}, 99),
+    ("Negamax5 centre", "bots.negamaxv5.Negamax5", {"ordre_coups": "centre"}, 99),
+    ("Negamax5 menaces", "bots.negamaxv5.Negamax5", {"menaces": True, "evaluation": evaluation.evaluation_menaces}, 99),
+    ("Solveur", "bots.solveur.Solveur", {"menaces": True}, 99),
+    ("MCTS", "bots.mcts.MCTS", {"simulations": 2000}, 0),
+]
+
+
+def lire_positions(chemin):
+    """Renvoie la liste des positions du fichier : dictionnaires (catégorie, nom, coups, profondeur, solutions)."""
+    positions = []
+    with open(chemin, encoding="utf-8") as fichier:
+        for ligne in fichier:
+            ligne = ligne.split("#", 1)[0].strip()
+            if not ligne:
+                continue
+            catégorie, nom, coups, profondeur, solutions = ligne.split()
+            positions.append({
+                "catégorie": catégorie,
+                "nom": nom,
+                "coups": [] if coups == "-" else [int(colonne) for colonne in coups],
+                "profondeur": int(profondeur),
+                "solutions": None if solutions == "?" else {int(colonne) for colonne in solutions.split(",")},
+            })
+    return positions
+
+
+def construire_position(coups):
+    # Renvoie le plateau et le symbole du joueur qui doit jouer, X ayant joué le premier coup.
+    plateau = Plateau()
+    symbole = "X"
+    for colonne in coups:
+        plateau.ajouter_jeton(colonne, symbole)
+        symbole = "O" if symbole == "X" else "X"
+    return plateau, symbole
+
+
+def mesurer(nom, chemin, paramètres, profondeur_max, position, répétitions):
+    """Cherche le coup de `position` avec un bot neuf, `répétitions` fois ; garde la meilleure durée."""
+    plateau, symbole = construire_position(position["coups"])
+    adversaire = Joueur("Adversaire", "O" if symbole == "X" else "X")
+    profondeur = min(position["profondeur"], profondeur_max)
+    if profondeur_max:
+        paramètres = dict(paramètres, profondeur=profondeur)
+    meilleure_durée = None
+    for _ in range(répétitions):
+        bot = créer_bot((chemin, dict(paramètres, nom=nom, symbole=symbole)))
+        bot.nouvelle_partie(0)
+        # Tables qui comptent leurs succès, posées avant la recherche pour que le bot ne crée pas les siennes.
+        if hasattr(bot, "table_de_transposition"):
+            bot.table_de_transposition = TableTranspositionComptée(bot.taille_table_mo)
+        if hasattr(bot, "table_solveur"):
+            bot.table_solveur = TableTranspositionComptée(bot.taille_table_mo)
+        début = time.perf_counter()
+        coup = bot.trouver_coup(plateau.copier_grille(), adversaire)
+        durée = time.perf_counter() - début
+        if meilleure_durée is None or durée < meilleure_durée:
+            meilleure_durée = durée
+
+    sondages = trouvées = 0
+    for attribut in ("table_de_transposition", "table_solveur"):
+        table = getattr(bot, attribut, None)
+        if table is not None:
+            sondages += table.sondages
+            trouvées += table.trouvées
+    return {
+        "profondeur": profondeur if profondeur_max else None,
+        "coup": coup,
+        "correct": None if position["solutions"] is None else coup in position["solutions"],
+        "temps": meilleure_durée,
+        "nœuds": bot.coups,
+        "nœuds_par_seconde": bot.coups / max(meilleure_durée, 1e-9),
+        "taux_table": trouvées / sondages if sondages else None,
+    }
+
+
+def lancer(positions, bots=BOTS, répétitions=3, afficher=True):
+    """Mesure chaque bot sur chaque position ; renvoie les résultats sous forme de dictionnaire sérialisable en JSON."""
+    résultats = {"python": platform.python_version(), "machine": platform.machine(), "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                 "bots": {}}
+    for nom, chemin, paramètres, profondeur_max in bots:
+        par_position = {}
+        for position in positions:
+            par_position[position["nom"]] = mesurer(nom, chemin, paramètres, profondeur_max, position, répétitions)
+        temps = sum(mesure["temps"] for mesure in par_position.values())
+        nœuds = sum(mesure["nœuds"] for mesure in par_position.values())
+        évaluées = [mesure["correct"] for mesure in par_position.values() if mesure["correct"] is not None]
+        résultats["bots"][nom] = {"temps": temps, "nœuds": nœuds, "nœuds_par_seconde": nœuds / max(temps, 1e-9),
+                                  "correctes": sum(évaluées), "évaluées": len(évaluées), "positions": par_position}
+        if afficher:
+            print(f"{nom:<18} {temps:8.3f} s {nœuds:>10} nœuds {nœuds / max(temps, 1e-9):>9.0f} nœuds/s "
+                  f"{sum(évaluées)}/{len(évaluées)} correctes")
+    return résultats
+
+
+def comparer(résultats, référence, seuil=0.10):
+    """
+    Compare des résultats à une référence enregistrée. Renvoie la liste des régressions : un bot dont le temps total
+    dépasse celui de la référence de plus de `seuil` (10 % par défaut), ou une position résolue dans la référence
+    et ratée maintenant. Les changements de nombre de nœuds sont affichés sans être des régressions.
+    """
+    régressions = []
+    for nom, mesures in résultats["bots"].items():
+        ancien = référence["bots"].get(nom)
+        if ancien is None:
+            continue
+        rapport = mesures["temps"] / max(ancien["temps"], 1e-9)
+        print(f"{nom:<18} temps x{rapport:.2f}, nœuds {ancien['nœuds']} -> {mesures['nœuds']}")
+        if rapport > 1 + seuil:
+            régressions.append(f"{nom} : {ancien['temps']:.3f} s -> {mesures['temps']:.3f} s (x{rapport:.2f})")
+        for position, mesure in mesures["positions"].items():
+            ancienne = ancien["positions"].get(position)
+            if ancienne is not None and ancienne["correct"] and mesure["correct"] is False:
+                régressions.append(f"{nom} : la position {position} n'est plus résolue (coup {mesure['coup']})")
+    return régressions
+
+
+def vérifier_ordre_coups(résultats):
+    """
+    L'ordre des coups par historique (Negamax5) doit explorer moins de nœuds que le tri par le centre
+    (Negamax5 centre) sur l'ensemble des positions. Renvoie la liste des régressions, vide si les deux bots
+    n'ont pas été mesurés.
+    """
+    historique, centre = résultats["bots"].get("Negamax5"), résultats["bots"].get("Negamax5 centre")
+    if historique is None or centre is None or historique["nœuds"] <= centre["nœuds"]:
+        return []
+    return [f"Negamax5 : {historique['nœuds']} nœuds avec l'historique, {centre['nœuds']} avec le tri par le centre"]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Banc d'essai des bots sur des positions fixes.")
+    parser.add_argument("--positions", default="assets/positions_benchmark.txt")
+    parser.add_argument("--bots", nargs="*", default=None, help="noms des bots à mesurer (tous par défaut)")
+    parser.add_argument("--répétitions", type=int, default=3, help="recherches par position, la plus rapide compte")
+    parser.add_argument("--sortie", default=None, help="fichier JSON où écrire les résultats")
+    parser.add_argument("--référence", default=None, help="résultats JSON enregistrés auxquels se comparer")
+    parser.add_argument("--seuil", type=float, default=0.10, help="ralentissement toléré par rapport à la référence")
+    arguments = parser.parse_args()
+
+    bots = BOTS if arguments.bots is None else [bot for bot in BOTS if bot[0] in arguments.bots]
+    résultats = lancer(lire_positions(arguments.positions), bots, arguments.répétitions)
+    if arguments.sortie:
+        with open(arguments.sortie, "w", encoding="utf-8") as fichier:
+            json.dump(résultats, fichier, ensure_ascii=False, indent=1)
+
+    régressions = vérifier_ordre_coups(résultats)
+    if arguments.référence:
+        with open(arguments.référence, encoding="utf-8") as fichier:
+            régressions += comparer(résultats, json.load(fichier), arguments.seuil)
+    for régression in régressions:
+        print("Régression :", régression)
+    sys.exit(1 if régressions else 0)
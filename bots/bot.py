@@ -4,13 +4,21 @@ from ..moteur.joueur import Joueur
 class Bot(Joueur):
     def __init__(self, nom, symbole):
         super().__init__(nom, symbole)
-        self.target = random.randint(0, 6)
+        self.target = None
+        # Générateur propre au bot : tous ses tirages au hasard passent par lui (voir nouvelle_partie).
+        self.aléatoire = random.Random()
+
+    def nouvelle_partie(self, graine=None):
+        """
+        Oublie ce qui a été appris pendant les parties précédentes et réinitialise le générateur avec graine :
+        avec la même graine, un bot sans limite de temps rejoue exactement la même partie.
+        """
+        self.aléatoire.seed(graine)
+        self.target = None
 
 
     def trouver_coup(self, plateau, joueur2) -> int:
-        if self.target in plateau.colonnes_jouables:
-            return self.target
-        else:
-            while self.target not in plateau.colonnes_jouables:
-                self.target = random.randint(0, 6)
-            return self.target
\ No newline at end of file
+        # Rejoue la même colonne tant qu'elle n'est pas pleine, puis en choisit une autre au hasard.
+        if self.target not in plateau.colonnes_jouables:
+            self.target = self.aléatoire.choice(list(plateau.colonnes_jouables))
+        return self.target
\ No newline at end of file
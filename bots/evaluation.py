@@ -0,0 +1,69 @@
+from functools import lru_cache
+
+from .table_transposition import SEUIL_VICTOIRE
+from ..moteur.plateau_bitboard import cases_gagnantes
+
+# Fonctions d'évaluation utilisables à l'horizon de la recherche : evaluation(plateau, symbole) renvoie
+# un score du point de vue de `symbole`, le joueur qui doit jouer, toujours inférieur à SEUIL_VICTOIRE
+# en valeur absolue pour ne pas être confondu avec une victoire trouvée.
+
+POIDS_MENACE = 8
+POIDS_PARITÉ = 8
+POIDS_MENACE_IMMÉDIATE = 200
+
+
+@lru_cache(maxsize=None)
+def tables_évaluation(colonnes, lignes):
+    """Masques précalculés pour une taille de plateau (même format de bits que PlateauBitboard)."""
+    hauteur = lignes + 1
+    colonne_pleine = (1 << lignes) - 1
+    bas = sum(1 << (colonne * hauteur) for colonne in range(colonnes))
+    plateau_complet = bas * colonne_pleine
+    # Rangées 1, 3, 5... en comptant depuis le bas : les menaces du premier joueur y sont les plus fortes.
+    rangées_impaires = sum(bas << ligne for ligne in range(0, lignes, 2))
+    # Poids des colonnes pour le contrôle du centre : 3 au centre, puis 2, puis 1.
+    centre = colonnes // 2
+    masques_centre = []
+    for poids in (3, 2, 1):
+        masque = 0
+        for colonne in range(colonnes):
+            if abs(colonne - centre) == 3 - poids:
+                masque |= colonne_pleine << (colonne * hauteur)
+        masques_centre.append((poids, masque))
+    return hauteur, bas, plateau_complet, rangées_impaires, tuple(masques_centre)
+
+
+def evaluation_nulle(plateau, symbole):
+    return 0
+
+
+def evaluation_menaces(plateau, symbole):
+    """
+    Compte les menaces (cases vides qui compléteraient un alignement) de chaque joueur, en favorisant
+    celles qui ont la bonne parité : rangées impaires pour le joueur qui a commencé, paires pour l'autre.
+    Ajoute le contrôle des colonnes centrales.
+    """
+    hauteur, bas, plateau_complet, rangées_impaires, masques_centre = tables_évaluation(plateau.colonnes, plateau.lignes)
+    jetons, masque = plateau.bitboards(symbole)
+    adverses = jetons ^ masque
+    possibles = (masque + bas) & plateau_complet
+
+    menaces = cases_gagnantes(jetons, masque, plateau.colonnes, plateau.lignes, plateau.alignement)
+    if menaces & possibles:
+        # Le joueur qui doit jouer gagne au coup suivant.
+        return POIDS_MENACE_IMMÉDIATE
+    menaces_adverses = cases_gagnantes(adverses, masque, plateau.colonnes, plateau.lignes, plateau.alignement)
+    immédiates_adverses = menaces_adverses & possibles
+    if immédiates_adverses & (immédiates_adverses - 1):
+        # Deux menaces adverses jouables : impossible de parer les deux.
+        return -POIDS_MENACE_IMMÉDIATE
+
+    # À égalité de jetons, le joueur qui doit jouer est celui qui a commencé.
+    a_commencé = jetons.bit_count() == adverses.bit_count()
+    bonnes_rangées = rangées_impaires if a_commencé else plateau_complet ^ rangées_impaires
+    score = POIDS_MENACE * (menaces.bit_count() - menaces_adverses.bit_count())
+    score += POIDS_PARITÉ * ((menaces & bonnes_rangées).bit_count()
+                             - (menaces_adverses & (plateau_complet ^ bonnes_rangées)).bit_count())
+    for poids, masque_centre in masques_centre:
+        score += poids * ((jetons & masque_centre).bit_count() - (adverses & masque_centre).bit_count())
+    return max(-SEUIL_VICTOIRE + 1, min(SEUIL_VICTOIRE - 1, score))
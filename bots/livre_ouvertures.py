@@ -0,0 +1,91 @@
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+
+from ..moteur.zobrist import trait
+
+# Version 2 : clés canoniques (une position et sa symétrique partagent la même entrée).
+MAGIC = b"P4LIVRE\x02"
+# En-tête : magic, nombre d'entrées, colonnes, lignes, alignement (16 octets, les clés restent alignées sur 8 octets).
+EN_TÊTE = struct.Struct("<8sIBBBx")
+# Enregistrement : meilleur coup, score de la position pour le joueur qui doit jouer.
+ENREGISTREMENT = struct.Struct("<Bxh")
+
+
+def clé_livre(plateau, symbole):
+    """
+    Renvoie (clé, miroir) : la plus petite des clés de la position et de sa symétrique, et vrai si c'est celle
+    de la symétrique. Le coup enregistré est toujours celui de la position qui a la clé.
+    """
+    plateau.activer_miroir()
+    clé = plateau.hash ^ trait(symbole)
+    clé_miroir = plateau.hash_miroir ^ trait(symbole)
+    if clé_miroir < clé:
+        return clé_miroir, True
+    return clé, False
+
+
+def écrire_livre(chemin, entrées, colonnes=7, lignes=6, alignement=4):
+    """
+    Écrit le livre d'ouvertures : `entrées` associe à chaque clé (voir clé_livre) un couple (coup, score).
+    Le fichier contient l'en-tête, puis les clés triées (entiers de 64 bits), puis les enregistrements dans le même ordre.
+    """
+    clés = sorted(entrées)
+    with open(chemin, "wb") as fichier:
+        fichier.write(EN_TÊTE.pack(MAGIC, len(clés), colonnes, lignes, alignement))
+        tableau_clés = array('Q', clés)
+        if tableau_clés.itemsize != 8 or struct.pack("=Q", 1) != struct.pack("<Q", 1):
+            raise RuntimeError("Le format du livre suppose des entiers de 64 bits petit-boutistes")
+        tableau_clés.tofile(fichier)
+        for clé in clés:
+            coup, score = entrées[clé]
+            fichier.write(ENREGISTREMENT.pack(coup, max(-32768, min(32767, score))))
+
+
+class LivreOuvertures:
+    """
+    Lecture d'un livre d'ouvertures par projection mémoire : l'ouverture ne lit que l'en-tête,
+    chaque recherche est une recherche dichotomique sur les clés triées.
+    """
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.ouvrir()
+
+    def ouvrir(self):
+        with open(self.chemin, "rb") as fichier:
+            self.mémoire = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.nb_entrées, self.colonnes, self.lignes, self.alignement = EN_TÊTE.unpack_from(self.mémoire, 0)
+        if magic[:7] == MAGIC[:7] and magic != MAGIC:
+            raise ValueError(f"{self.chemin} est dans un ancien format, il faut reconstruire le livre")
+        if magic != MAGIC:
+            raise ValueError(f"{self.chemin} n'est pas un livre d'ouvertures")
+        fin_clés = EN_TÊTE.size + 8 * self.nb_entrées
+        self.clés = memoryview(self.mémoire)[EN_TÊTE.size:fin_clés].cast('Q')
+        self.début_enregistrements = fin_clés
+
+    def __len__(self):
+        return self.nb_entrées
+
+    def chercher(self, plateau, symbole):
+        """Renvoie (coup, score) pour la position où `symbole` doit jouer, ou None si elle n'est pas dans le livre."""
+        if (plateau.colonnes, plateau.lignes, plateau.alignement) != (self.colonnes, self.lignes, self.alignement):
+            return None
+        clé, miroir = clé_livre(plateau, symbole)
+        i = bisect_left(self.clés, clé)
+        if i == self.nb_entrées or self.clés[i] != clé:
+            return None
+        coup, score = ENREGISTREMENT.unpack_from(self.mémoire, self.début_enregistrements + ENREGISTREMENT.size * i)
+        return (self.colonnes - 1 - coup if miroir else coup), score
+
+    def fermer(self):
+        self.clés.release()
+        self.mémoire.close()
+
+    def __getstate__(self):
+        # La projection mémoire ne se copie pas entre processus : on la rouvre à partir du chemin.
+        return {"chemin": self.chemin}
+
+    def __setstate__(self, état):
+        self.chemin = état["chemin"]
+        self.ouvrir()
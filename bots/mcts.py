@@ -0,0 +1,159 @@
+import math
+import time
+
+from .bot import Bot
+from ..moteur.plateau_bitboard import masques_plateau, tables_alignements, est_alignée
+
+
+class Nœud:
+    """
+    Position de l'arbre : `position` contient les jetons du joueur qui doit jouer, `masque` tous les jetons.
+    victoires est compté pour le joueur qui vient de jouer `coup` (une nulle vaut une demi-victoire).
+    résultat vaut 1 si ce coup a gagné, 0.5 s'il a rempli le plateau, None si la partie continue.
+    """
+    __slots__ = ("coup", "parent", "position", "masque", "enfants", "non_essayés", "victoires", "visites", "résultat")
+
+    def __init__(self, coup, parent, position, masque, non_essayés, résultat=None):
+        self.coup = coup
+        self.parent = parent
+        self.position = position
+        self.masque = masque
+        self.enfants = []
+        self.non_essayés = non_essayés
+        self.victoires = 0.0
+        self.visites = 0
+        self.résultat = résultat
+
+
+class MCTS(Bot):
+    """
+    Recherche arborescente Monte-Carlo (UCT). Les parties aléatoires sont jouées sur deux entiers
+    (bitboards), sans copier de plateau. L'arbre est gardé d'un coup à l'autre : le sous-arbre de la
+    position atteinte après notre coup et celui de l'adversaire sert de nouvelle racine.
+    """
+    def __init__(self, nom, symbole, temps_max=1.0, simulations=0, exploration=1.4, lot=1):
+        """
+        simulations > 0 fixe le nombre de parties aléatoires par coup, sinon la recherche dure temps_max secondes.
+        lot est le nombre de parties aléatoires jouées depuis chaque nouvelle feuille.
+        """
+        super().__init__(nom, symbole)
+        self.temps_de_pensée_max = temps_max
+        self.simulations_max = simulations
+        self.exploration = exploration
+        self.lot = lot
+        self.racine = None
+        self.annulation = False
+        # Statistiques de la dernière recherche.
+        self.coups = 0
+        self.simulations_par_seconde = 0.0
+
+    def nouvelle_partie(self, graine=None):
+        super().nouvelle_partie(graine)
+        self.racine = None
+
+    def préparer_géométrie(self, colonnes, lignes, alignement=4):
+        self.colonnes = colonnes
+        self.hauteur = lignes + 1
+        self.bas, self.plateau_complet, self.masques_colonnes = masques_plateau(colonnes, lignes)
+        self.lignes_par_case = tables_alignements(colonnes, lignes, alignement)[0]
+
+    def colonnes_possibles(self, masque):
+        possibles = (masque + self.bas) & self.plateau_complet
+        return [colonne for colonne in range(self.colonnes) if possibles & self.masques_colonnes[colonne]]
+
+    def nouvelle_racine(self, position, masque):
+        # Cherche la position parmi les petits-enfants de l'ancienne racine avant d'en créer une nouvelle.
+        if self.racine is not None:
+            for enfant in self.racine.enfants:
+                for petit_enfant in enfant.enfants:
+                    if petit_enfant.position == position and petit_enfant.masque == masque:
+                        petit_enfant.parent = None
+                        return petit_enfant
+        return Nœud(None, None, position, masque, self.colonnes_possibles(masque))
+
+    def trouver_coup(self, plateau, joueur2) -> int:
+        self.préparer_géométrie(plateau.colonnes, plateau.lignes, getattr(plateau, "alignement", 4))
+        position, masque = plateau.bitboards(self.symbole)
+        self.racine = racine = self.nouvelle_racine(position, masque)
+
+        self.coups = 0
+        début = time.perf_counter()
+        fin = début + self.temps_de_pensée_max
+        while not self.annulation:
+            self.itération(racine)
+            self.coups += self.lot
+            if self.simulations_max:
+                if self.coups >= self.simulations_max:
+                    break
+            elif not self.coups & 63 and time.perf_counter() > fin:
+                break
+        self.simulations_par_seconde = self.coups / max(time.perf_counter() - début, 1e-9)
+
+        if not racine.enfants:
+            return self.aléatoire.choice(list(plateau.colonnes_jouables))
+        # Le coup le plus visité est le plus sûr.
+        return max(racine.enfants, key=lambda enfant: enfant.visites).coup
+
+    def itération(self, racine):
+        nœud = racine
+        # Sélection : on descend tant que le nœud est entièrement développé.
+        while not nœud.non_essayés and nœud.enfants and nœud.résultat is None:
+            nœud = self.meilleur_enfant(nœud)
+
+        # Développement : un nouvel enfant pour un coup pas encore essayé.
+        if nœud.résultat is None and nœud.non_essayés:
+            colonne = nœud.non_essayés.pop(self.aléatoire.randrange(len(nœud.non_essayés)))
+            coup = (nœud.masque + self.bas) & self.masques_colonnes[colonne]
+            masque = nœud.masque | coup
+            # Chez l'enfant, c'est à l'adversaire de jouer : ses jetons sont ceux de l'ancien masque moins les nôtres.
+            adverses = nœud.position ^ nœud.masque
+            if est_alignée(nœud.position | coup, coup.bit_length() - 1, self.lignes_par_case):
+                enfant = Nœud(colonne, nœud, adverses, masque, [], 1.0)
+            elif masque == self.plateau_complet:
+                enfant = Nœud(colonne, nœud, adverses, masque, [], 0.5)
+            else:
+                enfant = Nœud(colonne, nœud, adverses, masque, self.colonnes_possibles(masque))
+            nœud.enfants.append(enfant)
+            nœud = enfant
+
+        # Simulation : gains du joueur qui a joué le coup menant à `nœud`.
+        if nœud.résultat is not None:
+            gains = nœud.résultat * self.lot
+        else:
+            gains = self.lot - sum(self.partie_aléatoire(nœud.position, nœud.masque) for _ in range(self.lot))
+
+        # Rétropropagation, en changeant de point de vue à chaque niveau.
+        while nœud is not None:
+            nœud.visites += self.lot
+            nœud.victoires += gains
+            gains = self.lot - gains
+            nœud = nœud.parent
+
+    def meilleur_enfant(self, nœud):
+        log_visites = math.log(nœud.visites)
+        exploration = self.exploration
+        meilleur, meilleure_valeur = None, -1.0
+        for enfant in nœud.enfants:
+            valeur = enfant.victoires / enfant.visites + exploration * math.sqrt(log_visites / enfant.visites)
+            if valeur > meilleure_valeur:
+                meilleur, meilleure_valeur = enfant, valeur
+        return meilleur
+
+    def partie_aléatoire(self, position, masque):
+        """Joue des coups au hasard jusqu'à la fin : 1 si le joueur qui doit jouer gagne, 0.5 pour une nulle, 0 sinon."""
+        bas, plateau_complet, masques_colonnes = self.bas, self.plateau_complet, self.masques_colonnes
+        lignes_par_case, colonnes = self.lignes_par_case, self.colonnes
+        randrange = self.aléatoire.randrange
+        gagnant = 1.0
+        while masque != plateau_complet:
+            possibles = (masque + bas) & plateau_complet
+            coup = possibles & masques_colonnes[randrange(colonnes)]
+            while not coup:
+                coup = possibles & masques_colonnes[randrange(colonnes)]
+            position |= coup
+            masque |= coup
+            if est_alignée(position, coup.bit_length() - 1, lignes_par_case):
+                return gagnant
+            position ^= masque
+            gagnant = 1.0 - gagnant
+        return 0.5
@@ -1,5 +1,3 @@
-import random
-
 from .bot import Bot
 
 class Negamax(Bot):
@@ -30,7 +28,7 @@ class Negamax(Bot):
                 meilleur_coups = [col]
             elif score == meilleur_score:
                 meilleur_coups.append(col)
-                random.shuffle(meilleur_coups)
+                self.aléatoire.shuffle(meilleur_coups)
 
         # print()
         return meilleur_coups[0] if meilleur_coups is not None else 0
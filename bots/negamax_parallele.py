@@ -0,0 +1,178 @@
+import concurrent.futures
+import multiprocessing
+import time
+import weakref
+from multiprocessing import shared_memory
+
+from .negamaxv5 import Negamax5, TempsÉcoulé
+from .table_transposition import TableTransposition, SEUIL_VICTOIRE
+
+# Table partagée vue depuis un processus travailleur, ouverte une seule fois par l'initialiseur.
+_mémoire_travailleur = None
+_table_travailleur = None
+_annulation_travailleur = None
+
+
+def _initialiser_travailleur(nom_mémoire, taille_table_mo, annulation):
+    global _mémoire_travailleur, _table_travailleur, _annulation_travailleur
+    _mémoire_travailleur = shared_memory.SharedMemory(name=nom_mémoire)
+    _table_travailleur = TableTransposition(taille_table_mo, tampon=_mémoire_travailleur.buf)
+    _annulation_travailleur = annulation
+
+
+class _Travailleur(Negamax5):
+    # L'annulation vient du processus principal ; negamax la lit toutes les 1024 positions.
+    @property
+    def annulation(self):
+        return _annulation_travailleur.is_set()
+
+    @annulation.setter
+    def annulation(self, valeur):
+        pass
+
+
+def _évaluer_coup(plateau, colonne, profondeur, symbole, symbole_adverse, génération, evaluation, ordre_coups, menaces,
+                  échéance=None):
+    # Score du coup `colonne` pour `symbole`, cherché à `profondeur` demi-coups au total comme Negamax5.
+    # Lève TempsÉcoulé après `échéance` ou sur annulation.
+    bot = _Travailleur("Travailleur", symbole, profondeur=profondeur, evaluation=evaluation, ordre_coups=ordre_coups,
+                       menaces=menaces)
+    bot.table_de_transposition = _table_travailleur
+    bot.échéance = échéance
+    bot.préparer_recherche(plateau, symbole_adverse)
+    bot.profondeur_racine = profondeur
+    _table_travailleur.génération = génération
+
+    colonne_est_enlevée = plateau.jouer_coup_reversible(colonne, symbole)
+    if plateau.est_victoire(colonne):
+        score = 1000 + profondeur
+    else:
+        score = -bot.negamax(plateau, profondeur - 1, symbole_adverse, -float('inf'), float('inf'))
+    plateau.annuler_coup(colonne, colonne_est_enlevée, symbole)
+    return colonne, score, bot.coups
+
+
+def _libérer(executor, table, mémoire):
+    executor.shutdown(cancel_futures=True)
+    table.libérer()
+    mémoire.close()
+    mémoire.unlink()
+
+
+class NegamaxParallele(Negamax5):
+    """
+    Negamax5 qui répartit les coups de la racine entre `travailleurs` processus.
+    Les travailleurs partagent une même table de transposition posée sur une mémoire partagée,
+    ce qu'un travailleur a appris sur une position profite donc aux autres.
+    """
+    def __init__(self, nom, symbole, profondeur=4, temps_max=0, taille_table_mo=16, livre=None, evaluation=None,
+                 ordre_coups="historique", menaces=False, travailleurs=4):
+        super().__init__(nom, symbole, profondeur=profondeur, temps_max=temps_max, taille_table_mo=taille_table_mo,
+                         livre=livre, evaluation=evaluation, ordre_coups=ordre_coups, menaces=menaces)
+        self.travailleurs = travailleurs
+        self.executor = None
+        self.mémoire = None
+        self.libération = None
+        # Signal d'arrêt partagé avec les travailleurs.
+        self.annulation_travailleurs = None
+
+    def démarrer(self):
+        if self.executor is not None:
+            return
+        self.mémoire = shared_memory.SharedMemory(create=True, size=TableTransposition.taille_octets(self.taille_table_mo))
+        self.table_de_transposition = TableTransposition(self.taille_table_mo, tampon=self.mémoire.buf)
+        self.annulation_travailleurs = multiprocessing.Event()
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.travailleurs, initializer=_initialiser_travailleur,
+            initargs=(self.mémoire.name, self.taille_table_mo, self.annulation_travailleurs))
+        self.libération = weakref.finalize(self, _libérer, self.executor, self.table_de_transposition, self.mémoire)
+
+    def fermer(self):
+        if self.libération is not None:
+            self.libération()
+        self.executor = None
+        self.mémoire = None
+        self.table_de_transposition = None
+        self.libération = None
+        self.annulation_travailleurs = None
+
+    def __getstate__(self):
+        # Le pool et la mémoire partagée appartiennent au processus qui les a créés.
+        état = self.__dict__.copy()
+        état.update(executor=None, mémoire=None, libération=None, table_de_transposition=None,
+                    annulation_travailleurs=None)
+        return état
+
+    def trouver_coup(self, plateau, joueur2) -> int:
+        if self.travailleurs <= 1:
+            return super().trouver_coup(plateau, joueur2)
+
+        self.coups = 0
+        coup_livre = self.coup_du_livre(plateau)
+        if coup_livre is not None:
+            return coup_livre
+
+        self.démarrer()
+        self.annulation_travailleurs.clear()
+        self.table_de_transposition.nouvelle_recherche()
+        coups_restants = sum(plateau.lignes - plateau.hauteurs_colonnes[colonne] for colonne in plateau.colonnes_jouables)
+        coups = self.coups_racine(plateau)
+        if self.temps_de_pensée_max == 0:
+            profondeurs, échéance = [self.profondeur], None
+        else:
+            # Comme Negamax5.approfondir : de 1 demi-coup jusqu'à profondeur, dans la limite de temps_max.
+            profondeurs = range(1, min(self.profondeur, coups_restants) + 1)
+            échéance = time.time() + self.temps_de_pensée_max
+        meilleur_score, meilleur_coups = None, list(coups)
+        self.profondeur_atteinte = 0
+        for profondeur in profondeurs:
+            futures = [self.executor.submit(_évaluer_coup, plateau, col, profondeur, self.symbole, joueur2.symbole,
+                                            self.table_de_transposition.génération, self.evaluation, self.ordre_coups,
+                                            self.menaces, échéance)
+                       for col in coups]
+            try:
+                résultats = self.attendre(futures, échéance)
+            except TempsÉcoulé:
+                if self.annulation:
+                    raise
+                # Profondeur interrompue par l'échéance : on garde la précédente.
+                break
+            meilleur_score = -float('inf')
+            meilleur_coups = []
+            for col, score, nœuds in résultats:
+                self.coups += nœuds
+                if score > meilleur_score:
+                    meilleur_score = score
+                    meilleur_coups = [col]
+                elif score == meilleur_score:
+                    meilleur_coups.append(col)
+            self.profondeur_atteinte = profondeur
+            if meilleur_score >= SEUIL_VICTOIRE:
+                break
+            # L'itération suivante commence par les meilleurs coups de celle-ci.
+            coups = meilleur_coups + [col for col in coups if col not in meilleur_coups]
+
+        self.score = meilleur_score
+        return self.choisir_coup(plateau, meilleur_coups)
+
+    def attendre(self, futures, échéance):
+        """
+        Résultats des futures dans l'ordre. Sur annulation ou après `échéance`, arrête les travailleurs
+        et lève TempsÉcoulé, comme la recherche de Negamax5.
+        """
+        en_cours = set(futures)
+        try:
+            while en_cours:
+                if self.annulation or échéance is not None and time.time() > échéance:
+                    raise TempsÉcoulé
+                _, en_cours = concurrent.futures.wait(en_cours, timeout=0.01,
+                                                      return_when=concurrent.futures.FIRST_EXCEPTION)
+            return [future.result() for future in futures]
+        except TempsÉcoulé:
+            # Les travailleurs s'arrêtent au plus tard 1024 positions plus loin ; on les attend pour que
+            # la recherche suivante ne reparte pas avec le signal d'arrêt levé.
+            self.annulation_travailleurs.set()
+            for future in futures:
+                future.cancel()
+            concurrent.futures.wait(futures)
+            raise
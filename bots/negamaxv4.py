@@ -1,4 +1,3 @@
-import random
 import time
 
 from .bot import Bot
@@ -50,7 +49,7 @@ class Negamax4(Bot):
                     meilleur_coups = [col]
                 elif score == meilleur_score:
                     meilleur_coups.append(col)
-                    random.shuffle(meilleur_coups)
+                    self.aléatoire.shuffle(meilleur_coups)
         else:
             while time.time()-start_time <= self.temps_de_pensée_max and meilleur_score <= 0 and i <= coups_restants:
 
@@ -77,7 +76,7 @@ class Negamax4(Bot):
                         meilleur_coups = [col]
                     elif score == meilleur_score:
                         meilleur_coups.append(col)
-                        random.shuffle(meilleur_coups)
+                        self.aléatoire.shuffle(meilleur_coups)
                 i += 1
 
         # print()
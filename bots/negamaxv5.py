@@ -1,76 +1,264 @@
-import random
 import time
 
 from .bot import Bot
+from .livre_ouvertures import LivreOuvertures
+from .statistiques import instrumenter
+from .table_transposition import TableTransposition, EXACTE, INFÉRIEURE, SUPÉRIEURE, SEUIL_VICTOIRE
+from ..moteur.zobrist import trait
+
+# Demi-largeur de la fenêtre d'aspiration autour du score de l'itération précédente.
+FENÊTRE_ASPIRATION = 24
+# Bonus de l'ordre des coups par colonne plus proche du centre, face à l'historique (profondeur² par coupure).
+BONUS_CENTRE = 1000
+
+
+class TempsÉcoulé(Exception):
+    """Levée dans la recherche quand l'échéance de temps_max est dépassée ou que la recherche est annulée."""
+
 
 def tri_coups(plateau):
     centre = plateau.colonnes // 2
     # Sort playable columns by how close they are to the center.
-    return sorted(list(plateau.colonnes_jouables), key=lambda col: abs(col - centre))
+    # À égale distance, la colonne de gauche d'abord : l'ordre d'un ensemble de colonnes change au fil des coups.
+    return sorted(list(plateau.colonnes_jouables), key=lambda col: (abs(col - centre), col))
 
 class Negamax5(Bot):
-    def __init__(self, nom, symbole, profondeur=4, temps_max=0):
+    def __init__(self, nom, symbole, profondeur=4, temps_max=0, taille_table_mo=16, livre=None, evaluation=None,
+                 ordre_coups="historique", menaces=False, statistiques=False):
         """
         Initialize the Negamax bot.
+        taille_table_mo fixe la mémoire de la table de transposition, qui est gardée d'un coup à l'autre.
+        livre est un livre d'ouvertures (chemin ou LivreOuvertures) consulté avant chaque recherche.
+        evaluation(plateau, symbole) note les positions à l'horizon (voir bots/evaluation.py), 0 si None.
+        Avec temps_max, la recherche s'approfondit jusqu'à temps_max secondes et s'interrompt à l'échéance ;
+        profondeur est alors la profondeur maximale de l'approfondissement.
+        ordre_coups vaut "historique" (coup de la table, coup tueur, historique puis centre) ou "centre".
+        menaces active la génération de coups tactique (plateau.coups_tactiques) : un nœud qui a un coup
+        gagnant s'arrête sans chercher plus loin, et seuls les coups qui ne laissent pas l'adversaire gagner
+        au coup suivant sont explorés.
+        statistiques active les mesures de recherche de bots/statistiques.py (nœuds par demi-coup, coupures,
+        table, itérations, variation principale), rangées dans self.statistiques ; désactivées, elles ne coûtent rien.
         """
         super().__init__(nom, symbole)
         self.profondeur = profondeur
         self.coups = 0
         self.temps_de_pensée_max = temps_max
+        self.taille_table_mo = taille_table_mo
         self.table_de_transposition = None
+        self.traits = {}
+        self.livre = LivreOuvertures(livre) if isinstance(livre, str) else livre
+        self.evaluation = evaluation
+        self.ordre_coups = ordre_coups
+        self.menaces = menaces
+        # Heure limite de la recherche en cours (None sans limite) et profondeur de la dernière itération terminée.
+        self.échéance = None
+        self.profondeur_atteinte = 0
+        # Mis à True depuis un autre fil d'exécution pour interrompre la recherche (voir bots/reflexion.py).
+        self.annulation = False
+        self.profondeur_racine = 0
+        self.ordre_centre = []
+        self.bonus_centre = []
+        self.hauteur = 0
+        # Un coup tueur par demi-coup depuis la racine et historique des coupures par symbole, repérés par
+        # leur case (colonne * hauteur + ligne, comme les bitboards).
+        self.tueurs = []
+        self.historique = {}
+        # Score du coup renvoyé par le dernier trouver_coup.
+        self.score = None
+        self.statistiques = None
+        if statistiques:
+            instrumenter(self)
+
+    def nouvelle_partie(self, graine=None):
+        super().nouvelle_partie(graine)
+        if self.table_de_transposition is not None:
+            self.table_de_transposition.vider()
+        self.tueurs = []
+        self.historique = {}
 
     def trouver_coup(self, plateau, joueur2) -> int:
         self.coups = 0
-        meilleur_score = -float('inf')
-        start_time = time.time()
-        self.table_de_transposition = {}
-        i = -1
-        coups_restants = 0
-        for colonne in list(plateau.colonnes_jouables):
-            coups_restants += plateau.lignes - plateau.hauteurs_colonnes[colonne]
-        meilleur_coups = []
+        coup_livre = self.coup_du_livre(plateau)
+        if coup_livre is not None:
+            return coup_livre
+        self.préparer_recherche(plateau, joueur2.symbole)
+        coups_racine = self.coups_racine(plateau)
 
         if self.temps_de_pensée_max == 0:
-            for col in tri_coups(plateau):
-                colonne_est_enlevée = plateau.jouer_coup_reversible(col, self.symbole)
-                if plateau.est_victoire(col):
-                    plateau.annuler_coup(col, colonne_est_enlevée, self.symbole)
-                    return col
-
-                prochain_symbole = joueur2.symbole
-                score = -self.negamax(plateau, profondeur=self.profondeur + i, symbole=prochain_symbole,
-                                       alpha=-float('inf'), beta=float('inf'))
+            self.score, meilleur_coups = self.chercher_racine(plateau, self.profondeur, coups_racine, joueur2.symbole)
+            self.profondeur_atteinte = self.profondeur
+        else:
+            self.score, meilleur_coups = self.approfondir(plateau, coups_racine, joueur2.symbole)
+        return self.choisir_coup(plateau, meilleur_coups)
+
+    def approfondir(self, plateau, coups, symbole_adverse):
+        """
+        Approfondissement itératif de 1 demi-coup jusqu'à l'échéance fixée par temps_max, sans dépasser profondeur.
+        Chaque itération commence par les meilleurs coups de la précédente (la table de transposition garde
+        la suite de la variation principale) et cherche d'abord dans une fenêtre d'aspiration autour du
+        dernier score. Une itération interrompue par l'échéance est abandonnée : on renvoie
+        (score, meilleurs coups) de la dernière itération terminée.
+        """
+        # Une recherche interrompue laisse le plateau dans un état quelconque : on cherche sur une copie.
+        plateau = plateau.copier_grille()
+        coups_restants = plateau.colonnes * plateau.lignes - sum(plateau.hauteurs_colonnes)
+        meilleur_score, meilleur_coups = None, list(coups)
+        self.profondeur_atteinte = 0
+        self.échéance = time.time() + self.temps_de_pensée_max
+        try:
+            for profondeur in range(1, min(self.profondeur, coups_restants) + 1):
+                coups = meilleur_coups + [col for col in coups if col not in meilleur_coups]
+                if meilleur_score is None or abs(meilleur_score) >= SEUIL_VICTOIRE:
+                    score, meilleurs = self.chercher_racine(plateau, profondeur, coups, symbole_adverse)
+                else:
+                    alpha, beta = meilleur_score - FENÊTRE_ASPIRATION, meilleur_score + FENÊTRE_ASPIRATION
+                    score, meilleurs = self.chercher_racine(plateau, profondeur, coups, symbole_adverse, alpha, beta)
+                    if score <= alpha or score >= beta:
+                        # Le score est sorti de la fenêtre : on recommence avec une fenêtre complète.
+                        score, meilleurs = self.chercher_racine(plateau, profondeur, coups, symbole_adverse)
+                meilleur_score, meilleur_coups = score, meilleurs
+                self.profondeur_atteinte = profondeur
+                if abs(score) >= SEUIL_VICTOIRE:
+                    break
+        except TempsÉcoulé:
+            pass
+        finally:
+            self.échéance = None
+        return meilleur_score, meilleur_coups
+
+    def chercher_racine(self, plateau, profondeur, coups, symbole_adverse, alpha=-float('inf'), beta=float('inf')):
+        """
+        Cherche chaque coup de `coups` à `profondeur` demi-coups au total, avec la même fenêtre pour tous
+        pour garder les coups à égalité. Renvoie (meilleur score, meilleurs coups), dès la première victoire trouvée.
+        """
+        self.profondeur_racine = profondeur
+        meilleur_score = -float('inf')
+        meilleur_coups = []
+        for col in coups:
+            colonne_est_enlevée = plateau.jouer_coup_reversible(col, self.symbole)
+            if plateau.est_victoire(col):
                 plateau.annuler_coup(col, colonne_est_enlevée, self.symbole)
-                if score > 0:
-                    return col
-                if score > meilleur_score:
-                    meilleur_score = score
-                    meilleur_coups = [col]
-                elif score == meilleur_score:
-                    meilleur_coups.append(col)
+                return 1000 + profondeur, [col]
+
+            score = -self.negamax(plateau, profondeur=profondeur - 1, symbole=symbole_adverse, alpha=-beta, beta=-alpha)
+            plateau.annuler_coup(col, colonne_est_enlevée, self.symbole)
+            if score >= SEUIL_VICTOIRE:
+                return score, [col]
+            if score > meilleur_score:
+                meilleur_score = score
+                meilleur_coups = [col]
+            elif score == meilleur_score:
+                meilleur_coups.append(col)
+        return meilleur_score, meilleur_coups
+
+    def coups_racine(self, plateau):
+        coups = tri_coups(plateau)
+        if self.menaces:
+            gagnants, non_perdants = plateau.coups_tactiques(self.symbole)
+            if gagnants:
+                return [(gagnants & -gagnants).bit_length() - 1]
+            # Si tous les coups perdent, on les garde tous.
+            if non_perdants:
+                coups = [col for col in coups if non_perdants >> col & 1]
+        return coups
+
+    def préparer_recherche(self, plateau, symbole_adverse):
+        # La table n'est allouée qu'au premier coup, pour que le bot reste léger à copier avant la partie.
+        if self.table_de_transposition is None:
+            self.table_de_transposition = TableTransposition(self.taille_table_mo)
+        self.table_de_transposition.nouvelle_recherche()
+        plateau.activer_miroir()
+        self.traits = {self.symbole: trait(self.symbole), symbole_adverse: trait(symbole_adverse)}
+        # Une colonne c de la position symétrique correspond à la colonne dernière_colonne - c.
+        self.dernière_colonne = plateau.colonnes - 1
+
+        centre = plateau.colonnes // 2
+        self.ordre_centre = sorted(range(plateau.colonnes), key=lambda col: abs(col - centre))
+        self.bonus_centre = [BONUS_CENTRE * (centre - abs(col - centre)) for col in range(plateau.colonnes)]
+        self.hauteur = plateau.lignes + 1
+        self.tueurs = [None] * (plateau.colonnes * plateau.lignes + 1)
+        for symbole in (self.symbole, symbole_adverse):
+            historique = self.historique.get(symbole)
+            if historique is None or len(historique) != plateau.colonnes * self.hauteur:
+                self.historique[symbole] = [0] * (plateau.colonnes * self.hauteur)
+            else:
+                # L'historique des coups précédents compte encore, mais moins.
+                self.historique[symbole] = [valeur // 2 for valeur in historique]
+
+    def ordonner_coups(self, plateau, symbole, ply, coup_table):
+        jouables = plateau.colonnes_jouables
+        if self.ordre_coups == "centre":
+            coups = tri_coups(plateau)
+            if coup_table is not None and coup_table in jouables:
+                coups.remove(coup_table)
+                coups.insert(0, coup_table)
+            return coups
+
+        historique = self.historique[symbole]
+        hauteurs = plateau.hauteurs_colonnes
+        hauteur = self.hauteur
+        bonus_centre = self.bonus_centre
+        # Tri stable : à valeur égale, l'ordre du centre départage.
+        coups = sorted([col for col in self.ordre_centre if col in jouables],
+                       key=lambda col: historique[col * hauteur + hauteurs[col]] + bonus_centre[col], reverse=True)
+        # Le coup tueur est une case : il ne vaut que si sa colonne est encore à la même hauteur.
+        tueur = self.tueurs[ply]
+        if tueur is not None and hauteurs[tueur // hauteur] == tueur % hauteur:
+            tueur //= hauteur
         else:
-            while time.time() - start_time <= self.temps_de_pensée_max and meilleur_score <= 0 and i <= coups_restants:
-                meilleur_score = -float('inf')
-                meilleur_coups = []
-                for col in tri_coups(plateau):
-                    colonne_est_enlevée = plateau.jouer_coup_reversible(col, self.symbole)
-                    if plateau.est_victoire(col):
-                        plateau.annuler_coup(col, colonne_est_enlevée, self.symbole)
-                        return col
-
-                    prochain_symbole = joueur2.symbole
-                    score = -self.negamax(plateau, profondeur=self.profondeur + i, symbole=prochain_symbole,
-                                           alpha=-float('inf'), beta=float('inf'))
-                    plateau.annuler_coup(col, colonne_est_enlevée, self.symbole)
-                    if score > 0:
-                        return col
-                    if score > meilleur_score:
-                        meilleur_score = score
-                        meilleur_coups = [col]
-                    elif score == meilleur_score:
-                        meilleur_coups.append(col)
-                i += 1
+            tueur = None
+        for coup in (tueur, coup_table):
+            if coup is not None and coup in jouables:
+                coups.remove(coup)
+                coups.insert(0, coup)
+        return coups
+
+    def noter_coupure(self, plateau, symbole, ply, coups, colonne, profondeur):
+        hauteurs = plateau.hauteurs_colonnes
+        hauteur = self.hauteur
+        historique = self.historique[symbole]
+        case = colonne * hauteur + hauteurs[colonne]
+        self.tueurs[ply] = case
+        historique[case] += profondeur * profondeur
+        # Les coups essayés avant la coupure n'y ont pas suffi : ils reculent dans l'historique.
+        for autre in coups:
+            if autre == colonne:
+                break
+            historique[autre * hauteur + hauteurs[autre]] -= profondeur * profondeur
+
+    def variation_principale(self, plateau, coup, symbole_adverse, longueur):
+        """
+        Variation principale après une recherche : `coup`, joué depuis `plateau`, suivi des meilleurs coups
+        de la table de transposition, sur au plus `longueur` demi-coups.
+        """
+        plateau = plateau.copier_grille()
+        symboles = (self.symbole, symbole_adverse)
+        variation = []
+        while coup is not None and coup in plateau.colonnes_jouables and len(variation) < longueur:
+            symbole = symboles[len(variation) % 2]
+            variation.append(coup)
+            plateau.ajouter_jeton(coup, symbole)
+            if plateau.est_victoire(coup) or plateau.est_nul():
+                break
+            symbole = symboles[len(variation) % 2]
+            clé = plateau.hash ^ self.traits[symbole]
+            clé_miroir = plateau.hash_miroir ^ self.traits[symbole]
+            entrée = self.table_de_transposition.sonder(min(clé, clé_miroir), 0)
+            coup = None if entrée is None else entrée[3]
+            if coup is not None and clé_miroir < clé:
+                coup = self.dernière_colonne - coup
+        return variation
 
+    def coup_du_livre(self, plateau):
+        if self.livre is None:
+            return None
+        entrée = self.livre.chercher(plateau, self.symbole)
+        if entrée is None or entrée[0] not in plateau.colonnes_jouables:
+            return None
+        self.score = entrée[1]
+        return entrée[0]
+
+    def choisir_coup(self, plateau, meilleur_coups):
         if not meilleur_coups:
             return 0
 
@@ -79,41 +267,90 @@ class Negamax5(Bot):
         max_distance = max(abs(col - center) for col in plateau.colonnes_jouables) if plateau.colonnes_jouables else 1
 
         weights = [(max_distance - abs(col - center) + 1) for col in meilleur_coups]
-        selected_move = random.choices(meilleur_coups, weights=weights, k=1)[0]
+        selected_move = self.aléatoire.choices(meilleur_coups, weights=weights, k=1)[0]
         return selected_move
 
-    def grille_à_tuple(self, plateau):
-        return tuple(tuple(col + ["."] * (plateau.lignes - len(col))) for col in plateau.grille)
-
     def negamax(self, plateau, profondeur, symbole, alpha, beta):
         self.coups += 1
-        if profondeur == 0 or plateau.est_nul():
+        if not self.coups & 1023 and (self.annulation or self.échéance is not None and time.time() > self.échéance):
+            raise TempsÉcoulé
+        if plateau.est_nul():
             return 0
+        if profondeur == 0:
+            return 0 if self.evaluation is None else self.evaluation(plateau, symbole)
 
-        clé = (self.grille_à_tuple(plateau), profondeur, symbole)
-        if clé in self.table_de_transposition:
-            return self.table_de_transposition[clé]
+        # La clé est le hash de Zobrist du plateau combiné au joueur qui doit jouer. Une position et sa symétrique
+        # partagent la même entrée : on garde la plus petite des deux clés, et les coups de la table sont
+        # ceux de la position qui a cette clé.
+        clé = plateau.hash ^ self.traits[symbole]
+        clé_miroir = plateau.hash_miroir ^ self.traits[symbole]
+        miroir = clé_miroir < clé
+        if miroir:
+            clé = clé_miroir
+        # Les coups gagnants sont repérés tous à la fois, sans jouer chaque coup.
+        if self.menaces:
+            gagnants, non_perdants = plateau.coups_tactiques(symbole)
+        else:
+            gagnants = plateau.colonnes_gagnantes(symbole)
+        if gagnants:
+            coup_gagnant = (gagnants & -gagnants).bit_length() - 1
+            # Le coup gagnant compte dans l'historique comme une coupure, comme s'il avait été joué dans la boucle.
+            case = coup_gagnant * self.hauteur + plateau.hauteurs_colonnes[coup_gagnant]
+            self.historique[symbole][case] += profondeur * profondeur
+            if miroir:
+                coup_gagnant = self.dernière_colonne - coup_gagnant
+            self.table_de_transposition.stocker(clé, 1000 + profondeur, profondeur, EXACTE, coup_gagnant)
+            return 1000 + profondeur
+        if self.menaces and not non_perdants:
+            # Chaque coup laisse une victoire à l'adversaire, qui la jouera au nœud suivant.
+            return -(1000 + profondeur - 1)
+        entrée = self.table_de_transposition.sonder(clé, profondeur)
+        coup_table = None
+        if entrée is not None:
+            score, profondeur_entrée, borne, coup_table = entrée
+            if miroir and coup_table is not None:
+                coup_table = self.dernière_colonne - coup_table
+            if profondeur_entrée >= profondeur:
+                if borne == EXACTE:
+                    return score
+                if borne == INFÉRIEURE and score > alpha:
+                    alpha = score
+                elif borne == SUPÉRIEURE and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
 
+        ply = self.profondeur_racine - profondeur
+        coups = self.ordonner_coups(plateau, symbole, ply, coup_table)
+        if self.menaces:
+            coups = [col for col in coups if non_perdants >> col & 1]
+        alpha_initial = alpha
         meilleur_score = -float('inf')
-        for col in tri_coups(plateau):
+        meilleur_coup = None
+        for col in coups:
             colonne_est_enlevée = plateau.jouer_coup_reversible(col, symbole)
-            if plateau.est_victoire(col):
-                plateau.annuler_coup(col, colonne_est_enlevée, symbole)
-                self.table_de_transposition[clé] = 1000 + profondeur
-                return 1000 + profondeur
-
             symbole_suivant = self.symbole if symbole != self.symbole else self.autre_symbole()
             score = -self.negamax(plateau, profondeur - 1, symbole_suivant, -beta, -alpha)
             plateau.annuler_coup(col, colonne_est_enlevée, symbole)
 
             if score > meilleur_score:
                 meilleur_score = score
+                meilleur_coup = col
             if meilleur_score > alpha:
                 alpha = meilleur_score
             if alpha >= beta:
+                self.noter_coupure(plateau, symbole, ply, coups, col, profondeur)
                 break
 
-        self.table_de_transposition[clé] = meilleur_score
+        if meilleur_score <= alpha_initial:
+            borne = SUPÉRIEURE
+        elif meilleur_score >= beta:
+            borne = INFÉRIEURE
+        else:
+            borne = EXACTE
+        if miroir and meilleur_coup is not None:
+            meilleur_coup = self.dernière_colonne - meilleur_coup
+        self.table_de_transposition.stocker(clé, meilleur_score, profondeur, borne, meilleur_coup)
         return meilleur_score
 
     def autre_symbole(self):
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from .negamaxv5 import TempsÉcoulé, tri_coups
+
+
+class Réflexion:
+    """
+    Recherche du coup d'un bot dans un fil d'exécution séparé, pour que l'interface continue de s'afficher.
+    Le bot cherche sur une copie du plateau ; on interroge terminée() à chaque image puis on lit coup.
+    Pour les bots Negamax5, coups et profondeur_racine donnent l'avancement de la recherche.
+    """
+    def __init__(self, bot, plateau, adversaire, coup_prévu=None):
+        """coup_prévu est un coup déjà trouvé par une Anticipation : il est joué sans nouvelle recherche."""
+        self.bot = bot
+        self.coup = coup_prévu
+        self.annulée = False
+        self.début = time.time()
+        self.fil = None
+        if coup_prévu is not None:
+            return
+        # Remis à zéro ici et pas dans le fil, pour qu'une annulation immédiate ne soit pas perdue.
+        bot.annulation = False
+        self.fil = threading.Thread(target=self.chercher, args=(plateau.copier_grille(), adversaire), daemon=True)
+        self.fil.start()
+
+    def chercher(self, plateau, adversaire):
+        try:
+            coup = self.bot.trouver_coup(plateau, adversaire)
+        except TempsÉcoulé:
+            return
+        if not self.annulée:
+            self.coup = coup
+
+    def terminée(self):
+        return self.fil is None or not self.fil.is_alive()
+
+    def durée(self):
+        return time.time() - self.début
+
+    def annuler(self):
+        # Le bot s'arrête au plus tard 1024 positions plus loin ; le coup éventuel est ignoré.
+        self.annulée = True
+        if self.fil is not None:
+            self.bot.annulation = True
+            self.fil.join()
+            self.bot.annulation = False
+
+
+class Anticipation:
+    """
+    Réflexion du bot pendant le tour de l'adversaire. Pour chaque coup possible de l'adversaire, les colonnes
+    centrales d'abord, le bot cherche sa réponse sur une copie du plateau. Ces recherches remplissent la table
+    de transposition que le bot garde d'un coup à l'autre, et une recherche terminée sur la position
+    effectivement jouée donne directement le coup du bot (coup_prévu).
+
+    Un bot à temps limité cherche chaque réponse pendant temps_max au premier passage, puis deux fois plus
+    longtemps à chaque passage suivant, en au plus passages_max passages ; un bot à profondeur fixe ne fait
+    qu'un passage.
+    """
+    passages_max = 4
+
+    def __init__(self, bot, plateau, adversaire):
+        self.bot = bot
+        self.annulée = False
+        # Hash du plateau après le coup de l'adversaire -> coup trouvé par une recherche complète.
+        self.coups_prévus = {}
+        bot.annulation = False
+        self.fil = threading.Thread(target=self.anticiper, args=(plateau.copier_grille(), adversaire), daemon=True)
+        self.fil.start()
+
+    def anticiper(self, plateau, adversaire):
+        temps_max = self.bot.temps_de_pensée_max
+        réponses = []
+        for colonne in tri_coups(plateau):
+            copie = plateau.copier_grille()
+            copie.jouer_coup_reversible(colonne, adversaire.symbole)
+            if not copie.est_victoire(colonne) and not copie.est_nul():
+                réponses.append(copie)
+        try:
+            durée = temps_max
+            for _ in range(self.passages_max):
+                if not réponses or self.annulée:
+                    break
+                self.bot.temps_de_pensée_max = durée
+                for copie in réponses:
+                    try:
+                        coup = self.bot.trouver_coup(copie, adversaire)
+                    except TempsÉcoulé:
+                        return
+                    if self.annulée:
+                        return
+                    self.coups_prévus[copie.hash] = coup
+                if temps_max == 0:
+                    break
+                durée *= 2
+        finally:
+            self.bot.temps_de_pensée_max = temps_max
+
+    def coup_prévu(self, plateau):
+        return self.coups_prévus.get(plateau.hash)
+
+    def annuler(self):
+        self.annulée = True
+        self.bot.annulation = True
+        self.fil.join()
+        self.bot.annulation = False
@@ -0,0 +1,212 @@
+import time
+
+from .negamaxv5 import Negamax5, TempsÉcoulé
+from .table_transposition import TableTransposition, TableTranspositionClésLongues, INFÉRIEURE, SUPÉRIEURE
+from ..moteur.plateau_bitboard import positions_gagnantes, positions_gagnantes_lignes, tables_alignements
+
+
+class Solveur(Negamax5):
+    """
+    Bot Negamax5 qui passe en résolution exacte dès qu'il reste au plus `cases_vides_max` cases vides.
+    La résolution cherche jusqu'à la fin de la partie sur des bitboards (position du joueur qui doit jouer
+    et masque de tous les jetons), avec des fenêtres nulles qui resserrent l'encadrement du score.
+
+    Score d'une position : 0 pour un nul, sinon positif si le joueur qui doit jouer gagne, égal au nombre
+    de ses jetons restant en main au moment où il gagne (plus la victoire est rapide, plus le score est grand).
+
+    Comme la recherche de Negamax5, la résolution s'arrête sur annulation ou à l'échéance de temps_max
+    en levant TempsÉcoulé.
+    """
+    def __init__(self, nom, symbole, profondeur=4, temps_max=0, taille_table_mo=16, livre=None, evaluation=None,
+                 ordre_coups="historique", menaces=False, cases_vides_max=16, statistiques=False):
+        # Avant super().__init__ : avec statistiques, instrumenter y pose une table comptée.
+        self.table_solveur = None
+        super().__init__(nom, symbole, profondeur=profondeur, temps_max=temps_max, taille_table_mo=taille_table_mo,
+                         livre=livre, evaluation=evaluation, ordre_coups=ordre_coups, menaces=menaces,
+                         statistiques=statistiques)
+        self.cases_vides_max = cases_vides_max
+        self.géométrie = None
+
+    def nouvelle_partie(self, graine=None):
+        super().nouvelle_partie(graine)
+        if self.table_solveur is not None:
+            self.table_solveur.vider()
+
+    def trouver_coup(self, plateau, joueur2) -> int:
+        cases_vides = plateau.colonnes * plateau.lignes - sum(plateau.hauteurs_colonnes)
+        if cases_vides > self.cases_vides_max:
+            return super().trouver_coup(plateau, joueur2)
+
+        if self.temps_de_pensée_max == 0:
+            self.score, coup = self.résoudre(plateau, self.symbole)
+            return coup
+
+        # À temps limité, la résolution a la moitié du temps ; si elle n'aboutit pas, Negamax5 cherche le reste.
+        début = time.time()
+        self.échéance = début + self.temps_de_pensée_max / 2
+        try:
+            self.score, coup = self.résoudre(plateau, self.symbole)
+            return coup
+        except TempsÉcoulé:
+            if self.annulation:
+                raise
+        finally:
+            self.échéance = None
+        temps_max = self.temps_de_pensée_max
+        self.temps_de_pensée_max = max(temps_max - (time.time() - début), 0.001)
+        try:
+            return super().trouver_coup(plateau, joueur2)
+        finally:
+            self.temps_de_pensée_max = temps_max
+
+    def préparer_géométrie(self, colonnes, lignes, alignement=4):
+        if self.géométrie == (colonnes, lignes, alignement):
+            return
+        self.géométrie = (colonnes, lignes, alignement)
+        self.colonnes = colonnes
+        self.lignes = lignes
+        self.alignement = alignement
+        self.hauteur = lignes + 1
+        self.toutes_les_lignes = tables_alignements(colonnes, lignes, alignement)[1]
+        # position + masque dépasse 64 bits au-delà de 63 bits de plateau : la clé ne tient plus dans
+        # TableTransposition, et la réduire confondrait des positions différentes.
+        self.clés_longues = colonnes * self.hauteur >= 64
+        self.nb_cases = colonnes * lignes
+        self.bas_colonnes = [1 << (colonne * self.hauteur) for colonne in range(colonnes)]
+        self.bas = sum(self.bas_colonnes)
+        self.plateau_complet = self.bas * ((1 << lignes) - 1)
+        self.colonnes_par_centre = sorted(range(colonnes), key=lambda col: abs(col - colonnes // 2))
+        self.masques_colonnes = [((1 << lignes) - 1) << (colonne * self.hauteur) for colonne in range(colonnes)]
+
+    def résoudre(self, plateau, symbole):
+        """
+        Renvoie (score, colonne) : la valeur exacte de la position pour `symbole`, qui doit jouer,
+        et un coup qui atteint cette valeur.
+        """
+        self.préparer_géométrie(plateau.colonnes, plateau.lignes, getattr(plateau, "alignement", 4))
+        if self.clés_longues:
+            if not isinstance(self.table_solveur, TableTranspositionClésLongues):
+                self.table_solveur = TableTranspositionClésLongues(self.taille_table_mo)
+        elif self.table_solveur is None or isinstance(self.table_solveur, TableTranspositionClésLongues):
+            self.table_solveur = TableTransposition(self.taille_table_mo)
+        self.coups = 0
+
+        position, masque = plateau.bitboards(symbole)
+        nb_coups = sum(plateau.hauteurs_colonnes)
+
+        possibles = (masque + self.bas) & self.plateau_complet
+        gagnants = possibles & self.positions_gagnantes(position, masque)
+        if gagnants:
+            return (self.nb_cases + 1 - nb_coups) // 2, self.colonne_du_coup(gagnants & -gagnants)
+
+        score = self.valeur(position, masque, nb_coups)
+
+        coups = self.coups_non_perdants(position, masque)
+        if not coups or nb_coups + 1 == self.nb_cases:
+            # Partie perdue ou dernière case : tous les coups se valent.
+            return score, self.colonne_du_coup(self.trier_coups(position, masque, possibles)[0])
+
+        # Un coup atteint la valeur si la position obtenue vaut au plus -score pour l'adversaire.
+        meilleur_coup = None
+        for coup in self.trier_coups(position, masque, coups):
+            if meilleur_coup is None:
+                meilleur_coup = coup
+            valeur_adverse = self.negamax_solveur(position ^ masque, masque | coup, nb_coups + 1, -score, -score + 1)
+            if valeur_adverse <= -score:
+                meilleur_coup = coup
+                break
+        return score, self.colonne_du_coup(meilleur_coup)
+
+    def valeur(self, position, masque, nb_coups):
+        # Recherche par fenêtres nulles : chaque appel indique si le score est au-dessus ou en dessous de `milieu`.
+        minimum = -((self.nb_cases - nb_coups) // 2)
+        maximum = (self.nb_cases + 1 - nb_coups) // 2
+        while minimum < maximum:
+            milieu = minimum + (maximum - minimum) // 2
+            # On teste d'abord autour de 0, là où se trouve la plupart des positions.
+            if milieu <= 0 and int(minimum / 2) < milieu:
+                milieu = int(minimum / 2)
+            elif milieu >= 0 and maximum // 2 > milieu:
+                milieu = maximum // 2
+            score = self.negamax_solveur(position, masque, nb_coups, milieu, milieu + 1)
+            if score <= milieu:
+                maximum = score
+            else:
+                minimum = score
+        return minimum
+
+    def negamax_solveur(self, position, masque, nb_coups, alpha, beta):
+        # On suppose que le joueur qui doit jouer ne peut pas gagner immédiatement.
+        self.coups += 1
+        if not self.coups & 1023 and (self.annulation or self.échéance is not None and time.time() > self.échéance):
+            raise TempsÉcoulé
+        suivants = self.coups_non_perdants(position, masque)
+        if not suivants:
+            return -((self.nb_cases - nb_coups) // 2)
+        if nb_coups >= self.nb_cases - 2:
+            return 0
+
+        minimum = -((self.nb_cases - 2 - nb_coups) // 2)
+        if alpha < minimum:
+            alpha = minimum
+            if alpha >= beta:
+                return alpha
+        maximum = (self.nb_cases - 1 - nb_coups) // 2
+        if beta > maximum:
+            beta = maximum
+            if alpha >= beta:
+                return beta
+
+        clé = position + masque
+        entrée = self.table_solveur.sonder(clé, 0)
+        if entrée is not None:
+            score, _, borne, _ = entrée
+            if borne == SUPÉRIEURE:
+                if beta > score:
+                    beta = score
+            elif alpha < score:
+                alpha = score
+            if alpha >= beta:
+                return alpha
+
+        for coup in self.trier_coups(position, masque, suivants):
+            score = -self.negamax_solveur(position ^ masque, masque | coup, nb_coups + 1, -beta, -alpha)
+            if score >= beta:
+                self.table_solveur.stocker(clé, score, 0, INFÉRIEURE)
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.table_solveur.stocker(clé, alpha, 0, SUPÉRIEURE)
+        return alpha
+
+    def trier_coups(self, position, masque, coups):
+        # Les coups qui créent le plus de menaces d'abord, le centre départage.
+        notés = []
+        for colonne in self.colonnes_par_centre:
+            coup = coups & self.masques_colonnes[colonne]
+            if coup:
+                menaces = self.positions_gagnantes(position | coup, masque).bit_count()
+                notés.append((-menaces, len(notés), coup))
+        notés.sort()
+        return [coup for _, _, coup in notés]
+
+    def coups_non_perdants(self, position, masque):
+        possibles = (masque + self.bas) & self.plateau_complet
+        menaces_adverses = self.positions_gagnantes(position ^ masque, masque)
+        forcés = possibles & menaces_adverses
+        if forcés:
+            if forcés & (forcés - 1):
+                # Deux menaces adverses à parer en même temps : la partie est perdue.
+                return 0
+            possibles = forcés
+        # On ne joue pas sous une case qui ferait gagner l'adversaire.
+        return possibles & ~(menaces_adverses >> 1)
+
+    def positions_gagnantes(self, position, masque):
+        if self.alignement == 4:
+            return positions_gagnantes(position, masque, self.hauteur, self.plateau_complet)
+        return positions_gagnantes_lignes(position, masque, self.toutes_les_lignes, self.plateau_complet)
+
+    def colonne_du_coup(self, coup):
+        return (coup.bit_length() - 1) // self.hauteur
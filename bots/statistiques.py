@@ -0,0 +1,203 @@
+import cProfile
+import os
+import time
+
+from .table_transposition import TableTranspositionComptée, SEUIL_VICTOIRE
+
+
+class StatistiquesRecherche:
+    """
+    Mesures de la dernière recherche d'un bot Negamax5 (ou dérivé) instrumenté par instrumenter(bot) :
+    nœuds par demi-coup depuis la racine, coupures beta et part des coupures obtenues dès le premier coup,
+    compteurs de la table de transposition, durée et nœuds de chaque itération, facteur de branchement effectif
+    et variation principale.
+
+    Les méthodes negamax, chercher_racine et trouver_coup du bot sont remplacées sur l'instance par celles-ci,
+    qui comptent puis appellent les méthodes de la classe : un bot non instrumenté n'exécute aucun de ces comptages.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.classe = type(bot)
+        # Résumés des recherches successives (voir résumé), un par appel à trouver_coup.
+        self.historique = []
+        self.nouvelle_recherche()
+
+    def nouvelle_recherche(self):
+        self.nœuds_par_ply = []
+        self.coupures = 0
+        self.coupures_premier_coup = 0
+        # (profondeur, nœuds, durée en secondes, score ou None si l'itération a été interrompue)
+        self.itérations = []
+        self.variation_principale = []
+        self.durée = 0.0
+        # Nombre de fils cherchés par chaque nœud ouvert, de la racine au nœud courant.
+        self.pile = []
+
+    def negamax(self, plateau, profondeur, symbole, alpha, beta):
+        ply = self.bot.profondeur_racine - profondeur
+        if ply >= len(self.nœuds_par_ply):
+            self.nœuds_par_ply.extend([0] * (ply + 1 - len(self.nœuds_par_ply)))
+        self.nœuds_par_ply[ply] += 1
+        pile = self.pile
+        if pile:
+            pile[-1] += 1
+        pile.append(0)
+        try:
+            score = self.classe.negamax(self.bot, plateau, profondeur, symbole, alpha, beta)
+        finally:
+            fils = pile.pop()
+        # Une coupure sans fils cherché vient de la table ou d'un coup gagnant, pas de l'ordre des coups.
+        if score >= beta and fils:
+            self.coupures += 1
+            if fils == 1:
+                self.coupures_premier_coup += 1
+        return score
+
+    def chercher_racine(self, plateau, profondeur, coups, symbole_adverse, alpha=-float('inf'), beta=float('inf')):
+        # La racine compte au demi-coup 0, ses fils au demi-coup 1 (voir negamax).
+        if not self.nœuds_par_ply:
+            self.nœuds_par_ply.append(0)
+        self.nœuds_par_ply[0] += 1
+        nœuds = self.bot.coups
+        début = time.perf_counter()
+        score = None
+        try:
+            score, meilleurs = self.classe.chercher_racine(self.bot, plateau, profondeur, coups, symbole_adverse,
+                                                           alpha, beta)
+        finally:
+            self.itérations.append((profondeur, self.bot.coups - nœuds, time.perf_counter() - début, score))
+        return score, meilleurs
+
+    def trouver_coup(self, plateau, joueur2):
+        self.nouvelle_recherche()
+        for table in self.tables():
+            table.remettre_compteurs()
+        début = time.perf_counter()
+        coup = self.classe.trouver_coup(self.bot, plateau, joueur2)
+        self.durée = time.perf_counter() - début
+        résumé = self.résumé()
+        # Les sondages du parcours de la variation principale ne sont pas comptés dans le résumé.
+        if self.itérations:
+            self.variation_principale = self.bot.variation_principale(plateau, coup, joueur2.symbole,
+                                                                      self.bot.profondeur_atteinte)
+            résumé["variation_principale"] = self.variation_principale
+        self.historique.append(résumé)
+        return coup
+
+    def tables(self):
+        return [table for table in (getattr(self.bot, "table_de_transposition", None),
+                                    getattr(self.bot, "table_solveur", None))
+                if isinstance(table, TableTranspositionComptée)]
+
+    def taux_coupure_premier_coup(self):
+        return self.coupures_premier_coup / self.coupures if self.coupures else None
+
+    def facteur_branchement(self):
+        """
+        Rapport des nœuds des deux dernières itérations terminées à des profondeurs successives ;
+        à défaut (recherche à profondeur fixe), racine d-ième des nœuds de l'unique itération.
+        Les itérations arrêtées par une victoire trouvée ne comptent que s'il n'y en a pas d'autres.
+        """
+        itérations = [itération for itération in self.itérations if itération[3] is not None]
+        sans_victoire = [itération for itération in itérations if abs(itération[3]) < SEUIL_VICTOIRE]
+        terminées = {}
+        for profondeur, nœuds, _, _ in sans_victoire or itérations:
+            # Une itération recommencée hors de la fenêtre d'aspiration compte pour ses deux recherches.
+            terminées[profondeur] = terminées.get(profondeur, 0) + nœuds
+        if not terminées:
+            return None
+        profondeur = max(terminées)
+        if profondeur - 1 in terminées and terminées[profondeur - 1]:
+            return terminées[profondeur] / terminées[profondeur - 1]
+        return terminées[profondeur] ** (1 / profondeur) if terminées[profondeur] else None
+
+    def résumé(self):
+        """Dictionnaire sérialisable en JSON de la dernière recherche."""
+        tables = {}
+        for nom, table in (("table", getattr(self.bot, "table_de_transposition", None)),
+                           ("table_solveur", getattr(self.bot, "table_solveur", None))):
+            if isinstance(table, TableTranspositionComptée):
+                tables[nom] = {"sondages": table.sondages, "trouvées": table.trouvées, "stockages": table.stockages,
+                               "collisions": table.collisions,
+                               "taux": table.trouvées / table.sondages if table.sondages else None}
+        return {
+            "durée": self.durée,
+            "nœuds": self.bot.coups,
+            "nœuds_par_ply": list(self.nœuds_par_ply),
+            "coupures": self.coupures,
+            "taux_coupure_premier_coup": self.taux_coupure_premier_coup(),
+            "facteur_branchement": self.facteur_branchement(),
+            "itérations": [{"profondeur": profondeur, "nœuds": nœuds, "durée": durée, "score": score}
+                           for profondeur, nœuds, durée, score in self.itérations],
+            "variation_principale": list(self.variation_principale),
+            **tables,
+        }
+
+
+def instrumenter(bot):
+    """
+    Active les statistiques de recherche sur `bot` (Negamax5 ou dérivé) et renvoie l'objet StatistiquesRecherche,
+    aussi rangé dans bot.statistiques. Les tables du bot sont remplacées par des tables comptées.
+    """
+    statistiques = StatistiquesRecherche(bot)
+    bot.statistiques = statistiques
+    bot.table_de_transposition = TableTranspositionComptée(bot.taille_table_mo)
+    if hasattr(bot, "table_solveur"):
+        bot.table_solveur = TableTranspositionComptée(bot.taille_table_mo)
+    # Attributs d'instance : ils masquent les méthodes de la classe, y compris dans les appels récursifs.
+    bot.negamax = statistiques.negamax
+    bot.chercher_racine = statistiques.chercher_racine
+    bot.trouver_coup = statistiques.trouver_coup
+    return statistiques
+
+
+class Profileur:
+    """
+    Enveloppe trouver_coup d'un bot pour profiler chaque coup séparément, avec cProfile ("cprofile", un fichier
+    .prof par coup, à lire avec pstats ou snakeviz) ou pyinstrument ("pyinstrument", un rapport texte par coup).
+    """
+    def __init__(self, bot, outil="cprofile", dossier="profils"):
+        if outil == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ImportError("le profilage avec pyinstrument demande le paquet pyinstrument (pip install pyinstrument)")
+        elif outil != "cprofile":
+            raise ValueError(f"outil de profilage inconnu : {outil}")
+        self.bot = bot
+        self.outil = outil
+        self.dossier = dossier
+        self.numéro = 0
+        # La méthode déjà en place, éventuellement instrumentée par instrumenter.
+        self.trouver_coup_profilé = bot.trouver_coup
+        os.makedirs(dossier, exist_ok=True)
+
+    def chemin(self, extension):
+        nom = "".join(caractère if caractère.isalnum() else "_" for caractère in self.bot.nom)
+        return os.path.join(self.dossier, f"{nom}_{self.bot.symbole}_{self.numéro:03d}.{extension}")
+
+    def trouver_coup(self, plateau, joueur2):
+        self.numéro += 1
+        if self.outil == "cprofile":
+            profil = cProfile.Profile()
+            coup = profil.runcall(self.trouver_coup_profilé, plateau, joueur2)
+            profil.dump_stats(self.chemin("prof"))
+            return coup
+
+        from pyinstrument import Profiler
+        profil = Profiler()
+        profil.start()
+        try:
+            coup = self.trouver_coup_profilé(plateau, joueur2)
+        finally:
+            profil.stop()
+        with open(self.chemin("txt"), "w", encoding="utf-8") as fichier:
+            fichier.write(profil.output_text())
+        return coup
+
+
+def profiler(bot, outil="cprofile", dossier="profils"):
+    """Profile chaque coup de `bot` dans `dossier` (voir Profileur) ; renvoie le Profileur."""
+    profileur = Profileur(bot, outil, dossier)
+    bot.trouver_coup = profileur.trouver_coup
+    return profileur
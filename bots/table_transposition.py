@@ -0,0 +1,176 @@
+from array import array
+
+EXACTE = 1
+INFÉRIEURE = 2  # le score est une borne inférieure (coupure beta)
+SUPÉRIEURE = 3  # le score est une borne supérieure (aucun coup n'a dépassé alpha)
+
+AUCUN_COUP = 0xFF
+# Au-delà de ce seuil, un score correspond à une victoire trouvée et dépend de la profondeur restante.
+SEUIL_VICTOIRE = 500
+
+
+class TableTransposition:
+    """
+    Table de transposition de taille fixe, rangée dans deux tableaux d'entiers de 64 bits préalloués.
+    Chaque emplacement contient les données compactées (score, profondeur, borne, meilleur coup, génération)
+    et la clé combinée aux données par un xor, ce qui permet de rejeter les collisions d'index.
+    Les emplacements vont par paires : le premier garde l'entrée la plus profonde (ou la plus récente
+    si elle date d'une recherche précédente), le second est remplacé à chaque fois.
+    """
+    OCTETS_PAR_ENTRÉE = 16
+
+    def __init__(self, taille_mo=16, tampon=None):
+        """
+        tampon permet de poser la table sur une mémoire existante (par exemple multiprocessing.shared_memory)
+        de TableTransposition.taille_octets(taille_mo) octets, remise à zéro, pour la partager entre processus.
+        """
+        self.taille_mo = taille_mo
+        self.nb_paires = self.paires_pour(taille_mo)
+        self.génération = 0
+        self.octets = None
+        if tampon is None:
+            self.vider()
+        else:
+            n = 2 * self.nb_paires * 8
+            self.octets = memoryview(tampon).cast('B')[:2 * n]
+            self.clés = self.octets[:n].cast('Q')
+            self.données = self.octets[n:].cast('Q')
+
+    @classmethod
+    def paires_pour(cls, taille_mo):
+        return max(1, int(taille_mo * 1024 * 1024) // (2 * cls.OCTETS_PAR_ENTRÉE))
+
+    @classmethod
+    def taille_octets(cls, taille_mo):
+        return 2 * cls.paires_pour(taille_mo) * cls.OCTETS_PAR_ENTRÉE
+
+    def vider(self):
+        if self.octets is not None:
+            self.octets[:] = bytes(len(self.octets))
+            return
+        self.clés = array('Q', [0]) * (2 * self.nb_paires)
+        self.données = array('Q', [0]) * (2 * self.nb_paires)
+
+    def libérer(self):
+        # Relâche les vues sur une mémoire partagée, nécessaire avant de la fermer.
+        if self.octets is not None:
+            self.clés.release()
+            self.données.release()
+            self.octets.release()
+
+    def nouvelle_recherche(self):
+        # Les entrées des recherches précédentes restent utilisables mais deviennent remplaçables.
+        self.génération = (self.génération + 1) & 0xFF
+
+    def sonder(self, clé, profondeur):
+        """
+        Renvoie (score, profondeur, borne, meilleur coup) ou None si la position n'est pas dans la table.
+        Les scores de victoire sont ramenés à la profondeur restante `profondeur` du nœud courant.
+        """
+        i = (clé % self.nb_paires) << 1
+        for j in (i, i + 1):
+            données = self.données[j]
+            if données and self.clés[j] ^ données == clé:
+                score = (données & 0xFFFF) - 0x8000
+                if score >= SEUIL_VICTOIRE:
+                    score += profondeur
+                elif score <= -SEUIL_VICTOIRE:
+                    score -= profondeur
+                coup = (données >> 32) & 0xFF
+                return score, (données >> 16) & 0xFF, (données >> 24) & 0xFF, None if coup == AUCUN_COUP else coup
+        return None
+
+    def stocker(self, clé, score, profondeur, borne, coup=None):
+        # Les scores de victoire sont stockés relativement au nœud pour rester valables à une autre profondeur.
+        if score >= SEUIL_VICTOIRE:
+            score -= profondeur
+        elif score <= -SEUIL_VICTOIRE:
+            score += profondeur
+        données = ((score + 0x8000) | profondeur << 16 | borne << 24
+                   | (AUCUN_COUP if coup is None else coup) << 32 | self.génération << 40)
+        i = (clé % self.nb_paires) << 1
+        ancienne = self.données[i]
+        if (not ancienne or self.clés[i] ^ ancienne == clé or (ancienne >> 16) & 0xFF <= profondeur
+                or (ancienne >> 40) & 0xFF != self.génération):
+            self.clés[i] = clé ^ données
+            self.données[i] = données
+        else:
+            self.clés[i + 1] = clé ^ données
+            self.données[i + 1] = données
+
+
+class TableTranspositionClésLongues:
+    """
+    Table de transposition rangée dans un dictionnaire, pour les clés qui ne tiennent pas sur 64 bits
+    (par exemple celles du Solveur sur les grands plateaux). Les clés sont gardées entières : deux positions
+    différentes ne partagent jamais une entrée. Même interface que TableTransposition ; quand le nombre
+    d'entrées permis par taille_mo est atteint, les plus anciennes sont retirées.
+    """
+    # Estimation pour un dictionnaire Python : clé entière, tuple de l'entrée et emplacement du dictionnaire.
+    OCTETS_PAR_ENTRÉE = 200
+
+    def __init__(self, taille_mo=16):
+        self.taille_mo = taille_mo
+        self.entrées_max = max(1, int(taille_mo * 1024 * 1024) // self.OCTETS_PAR_ENTRÉE)
+        self.génération = 0
+        self.vider()
+
+    def vider(self):
+        self.entrées = {}
+
+    def nouvelle_recherche(self):
+        self.génération = (self.génération + 1) & 0xFF
+
+    def sonder(self, clé, profondeur):
+        entrée = self.entrées.get(clé)
+        if entrée is None:
+            return None
+        score, profondeur_entrée, borne, coup = entrée
+        if score >= SEUIL_VICTOIRE:
+            score += profondeur
+        elif score <= -SEUIL_VICTOIRE:
+            score -= profondeur
+        return score, profondeur_entrée, borne, coup
+
+    def stocker(self, clé, score, profondeur, borne, coup=None):
+        if score >= SEUIL_VICTOIRE:
+            score -= profondeur
+        elif score <= -SEUIL_VICTOIRE:
+            score += profondeur
+        entrées = self.entrées
+        if clé not in entrées and len(entrées) >= self.entrées_max:
+            # Le dictionnaire garde l'ordre d'insertion : la première clé est la plus ancienne.
+            del entrées[next(iter(entrées))]
+        entrées[clé] = (score, profondeur, borne, coup)
+
+
+class TableTranspositionComptée(TableTransposition):
+    """
+    Même table, qui compte les sondages, les positions trouvées (taux de succès = trouvées / sondages),
+    les stockages et les collisions : sondages ratés alors que l'emplacement contient une autre position.
+    Réservée aux mesures (benchmark.py, bots/statistiques.py) : la table ordinaire ne paie pas ce comptage.
+    """
+    def __init__(self, taille_mo=16, tampon=None):
+        super().__init__(taille_mo, tampon)
+        self.remettre_compteurs()
+
+    def remettre_compteurs(self):
+        self.sondages = 0
+        self.trouvées = 0
+        self.stockages = 0
+        self.collisions = 0
+
+    def sonder(self, clé, profondeur):
+        self.sondages += 1
+        entrée = super().sonder(clé, profondeur)
+        if entrée is not None:
+            self.trouvées += 1
+        else:
+            i = (clé % self.nb_paires) << 1
+            if self.données[i] or self.données[i + 1]:
+                self.collisions += 1
+        return entrée
+
+    def stocker(self, clé, score, profondeur, borne, coup=None):
+        self.stockages += 1
+        super().stocker(clé, score, profondeur, borne, coup)
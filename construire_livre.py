@@ -0,0 +1,86 @@
+import argparse
+import concurrent.futures
+import time
+
+from moteur.plateau import Plateau
+from moteur.plateau_bitboard import PlateauBitboard
+from moteur.joueur import Joueur
+from bots.negamaxv5 import Negamax5
+from bots.livre_ouvertures import clé_livre, écrire_livre
+
+
+def énumérer_positions(coups_max, colonnes=7, lignes=6, alignement=4):
+    """
+    Renvoie {clé: (coups joués, symbole qui doit jouer, autre symbole, miroir)} pour toutes les positions distinctes
+    d'au plus `coups_max` jetons, que la partie ait été commencée par X ou par O. Une position et sa symétrique
+    ne sont gardées qu'une fois ; miroir indique que la clé est celle de la symétrique (voir clé_livre).
+    """
+    positions = {}
+    for premier, second in (("X", "O"), ("O", "X")):
+        plateau = Plateau(colonnes, lignes, alignement=alignement)
+        coups = []
+
+        def parcourir(symbole, autre):
+            clé, miroir = clé_livre(plateau, symbole)
+            if clé in positions:
+                return
+            positions[clé] = (tuple(coups), symbole, autre, miroir)
+            if len(coups) == coups_max:
+                return
+            for colonne in sorted(plateau.colonnes_jouables):
+                colonne_est_enlevée = plateau.jouer_coup_reversible(colonne, symbole)
+                if not plateau.est_victoire(colonne) and not plateau.est_nul():
+                    coups.append(colonne)
+                    parcourir(autre, symbole)
+                    coups.pop()
+                plateau.annuler_coup(colonne, colonne_est_enlevée, symbole)
+
+        parcourir(premier, second)
+    return positions
+
+
+def analyser(position, profondeur, colonnes=7, lignes=6, alignement=4):
+    coups, symbole, autre, miroir = position
+    plateau = PlateauBitboard(colonnes, lignes, alignement=alignement)
+    joueur, suivant = (symbole, autre) if len(coups) % 2 == 0 else (autre, symbole)
+    for colonne in coups:
+        plateau.ajouter_jeton(colonne, joueur)
+        joueur, suivant = suivant, joueur
+
+    bot = Negamax5("Livre", symbole, profondeur=profondeur, taille_table_mo=4)
+    coup = bot.trouver_coup(plateau, Joueur("Adversaire", autre))
+    # Le livre enregistre le coup de la position qui a la clé.
+    return (colonnes - 1 - coup if miroir else coup), bot.score
+
+
+def construire_livre(chemin, coups_max=4, profondeur=8, colonnes=7, lignes=6, alignement=4, max_workers=None):
+    positions = énumérer_positions(coups_max, colonnes, lignes, alignement)
+    print(f"{len(positions)} positions à analyser")
+    clés = list(positions)
+    entrées = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        résultats = executor.map(analyser, (positions[clé] for clé in clés), [profondeur] * len(clés),
+                                 [colonnes] * len(clés), [lignes] * len(clés), [alignement] * len(clés), chunksize=16)
+        for count, (clé, entrée) in enumerate(zip(clés, résultats), start=1):
+            entrées[clé] = entrée
+            if count % 500 == 0:
+                print(f"Analysé {count}/{len(clés)}")
+    écrire_livre(chemin, entrées, colonnes, lignes, alignement)
+    return len(entrées)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Construit un livre d'ouvertures pour les bots Negamax5.")
+    parser.add_argument("--sortie", default="assets/livre_ouvertures.bin")
+    parser.add_argument("--coups", type=int, default=4, help="nombre de jetons maximum des positions du livre")
+    parser.add_argument("--profondeur", type=int, default=8, help="profondeur de recherche pour chaque position")
+    parser.add_argument("--colonnes", type=int, default=7)
+    parser.add_argument("--lignes", type=int, default=6)
+    parser.add_argument("--alignement", type=int, default=4, help="nombre de jetons à aligner pour gagner")
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+
+    start_time = time.time()
+    nb = construire_livre(arguments.sortie, arguments.coups, arguments.profondeur, arguments.colonnes, arguments.lignes,
+                          arguments.alignement, max_workers=arguments.workers)
+    print(f"{nb} positions écrites dans {arguments.sortie} en {time.time() - start_time:.1f} secondes")
@@ -1,3 +1,4 @@
+import os
 import random
 import socket
 import pygame
@@ -5,7 +6,8 @@ import pygame
 from ..moteur.partie import Partie
 from ..moteur.joueur import Joueur
 from . import menu_pause
-from ..bots import negamaxv5
+from ..bots import negamaxv5, solveur
+from ..bots.reflexion import Réflexion, Anticipation
 from ..utils import afficher_texte, dict_couleurs, couleurs_jetons, couleur_plateau, est_local, récupérer_port, récupérer_ip_cible, chemin_absolu_dossier
 import uuid
 
@@ -115,8 +117,18 @@ def main(profondeur=6):
     clock = pygame.time.Clock()
     joueur1 = Joueur("Joueur 1", "X")
     if profondeur > 0:
+        # Aux niveaux faciles, le bot cherche à profondeur fixe. Au niveau difficile, il s'approfondit pendant
+        # 3 secondes au plus, sans dépasser profondeur (voir Negamax5.approfondir).
         temp_de_pensée_max = 3 if profondeur >= 8 else 0
-        joueur2 = negamaxv5.Negamax5(random.choice(noms_robots), "O", profondeur=profondeur, temps_max=temp_de_pensée_max)
+        if profondeur >= 8:
+            # En fin de partie le bot joue les coups parfaits au lieu de chercher pendant 3 secondes,
+            # en début de partie il suit le livre d'ouvertures s'il a été construit (construire_livre.py).
+            chemin_livre = chemin_absolu_dossier + "assets/livre_ouvertures.bin"
+            livre = chemin_livre if os.path.exists(chemin_livre) else None
+            joueur2 = solveur.Solveur(random.choice(noms_robots), "O", profondeur=profondeur, temps_max=temp_de_pensée_max, livre=livre,
+                                      menaces=True)
+        else:
+            joueur2 = negamaxv5.Negamax5(random.choice(noms_robots), "O", profondeur=profondeur, temps_max=temp_de_pensée_max)
 
     else:
         joueur2 = Joueur("Joueur 2", "O")
@@ -131,15 +143,70 @@ def main(profondeur=6):
     fenetre = pygame.display.set_mode((largeur_fenetre, hauteur_fenetre))
     pygame.display.set_caption("Partie de Puissance 4")
     partie_en_cours = True
-    while partie_en_cours:
-        affiche_trucs_de_base(plateau_largeur, plateau_hauteur, arriere_plan, partie, fenetre)
+    réflexion = None
+    anticipation = None
+    try:
+        while partie_en_cours:
+            affiche_trucs_de_base(plateau_largeur, plateau_hauteur, arriere_plan, partie, fenetre)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                colonne = (event.pos[0] - decalage) // taille_case
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    for recherche in (réflexion, anticipation):
+                        if recherche is not None:
+                            recherche.annuler()
+                    pygame.quit()
+                    exit()
+                if event.type == pygame.MOUSEBUTTONDOWN and not est_tour_bot(partie):
+                    colonne = (event.pos[0] - decalage) // taille_case
+                    ligne_finale = partie.plateau.hauteurs_colonnes[colonne]
+                    symbole = partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole
+                    animation_jeton(colonne, ligne_finale, symbole)
+                    if partie.jouer(colonne, partie.tour_joueur):
+
+                        partie_en_cours = vérifie_fin_de_partie(fenetre, hauteur_fenetre, largeur_fenetre, partie, colonne)
+
+                        if partie.tour_joueur == 1:
+                            partie.tour_joueur = 2
+                        else:
+                            partie.tour_joueur = 1
+
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        # Les recherches en cours sont abandonnées, elles recommenceront au retour du menu.
+                        for recherche in (réflexion, anticipation):
+                            if recherche is not None:
+                                recherche.annuler()
+                        réflexion = anticipation = None
+                        if menu_pause.main():
+                            return
+                        else:
+                            fenetre = pygame.display.set_mode((largeur_fenetre, hauteur_fenetre))
+
+            if est_tour_bot(partie) and partie_en_cours and réflexion is None:
+                coup_prévu = None
+                if anticipation is not None:
+                    anticipation.annuler()
+                    coup_prévu = anticipation.coup_prévu(partie.plateau)
+                    anticipation = None
+                réflexion = Réflexion(partie.joueur2, partie.plateau, partie.joueur1, coup_prévu=coup_prévu)
+
+            # Pendant le tour du joueur, le bot réfléchit aux réponses possibles.
+            if (partie.tour_joueur == 1 and isinstance(partie.joueur2, negamaxv5.Negamax5) and partie_en_cours
+                    and anticipation is None):
+                anticipation = Anticipation(partie.joueur2, partie.plateau, partie.joueur1)
+
+            if réflexion is not None:
+                texte = f"{joueur2.nom} réfléchit..."
+                if réflexion.bot.coups:
+                    texte += f" profondeur {réflexion.bot.profondeur_racine}, {réflexion.bot.coups} positions"
+                afficher_texte(fenetre, largeur_fenetre//2, decalage//2, texte, 35, dict_couleurs["bleu marin"])
+
+            # Le coup est joué une fois la recherche finie, et pas avant une demi-seconde pour qu'on voie le bot réfléchir.
+            if réflexion is not None and réflexion.terminée() and réflexion.durée() >= 0.5:
+                colonne = réflexion.coup
+                réflexion = None
+                #print("Coups évalués :", partie.joueur2.coups)
                 ligne_finale = partie.plateau.hauteurs_colonnes[colonne]
                 symbole = partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole
                 animation_jeton(colonne, ligne_finale, symbole)
@@ -152,41 +219,21 @@ def main(profondeur=6):
                     else:
                         partie.tour_joueur = 1
 
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if menu_pause.main():
-                        return
-                    else:
-                        fenetre = pygame.display.set_mode((largeur_fenetre, hauteur_fenetre))
-
-        if est_tour_bot(partie) and partie_en_cours:
-            afficher_texte(fenetre, largeur_fenetre//2, decalage//2, f"{joueur2.nom} réfléchit...", 45, dict_couleurs["bleu marin"])
-            pygame.display.flip()
-            pygame.time.wait(500)
-            colonne = partie.joueur2.trouver_coup(partie.plateau, partie.joueur1)
-            #print("Coups évalués :", partie.joueur2.coups)
-            ligne_finale = partie.plateau.hauteurs_colonnes[colonne]
-            symbole = partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole
-            animation_jeton(colonne, ligne_finale, symbole)
-            if partie.jouer(colonne, partie.tour_joueur):
-
-                partie_en_cours = vérifie_fin_de_partie(fenetre, hauteur_fenetre, largeur_fenetre, partie, colonne)
-
-                if partie.tour_joueur == 1:
-                    partie.tour_joueur = 2
-                else:
-                    partie.tour_joueur = 1
-
-        mouse = pygame.mouse.get_pos()
-        if decalage < mouse[0] < decalage + taille_case * plateau_largeur and not est_tour_bot(partie):
-            colonne = (mouse[0] - decalage) // taille_case
-            symbole = partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole
-            previsualise_pion(colonne, symbole, fenetre)
-        if partie_en_cours:
-            pygame.draw.circle(fenetre, couleurs_jetons[partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole], (largeur_fenetre - 50, 50), 25)
-            pygame.display.flip()
-        clock.tick(60)
+            mouse = pygame.mouse.get_pos()
+            if decalage < mouse[0] < decalage + taille_case * plateau_largeur and not est_tour_bot(partie):
+                colonne = (mouse[0] - decalage) // taille_case
+                symbole = partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole
+                previsualise_pion(colonne, symbole, fenetre)
+            if partie_en_cours:
+                pygame.draw.circle(fenetre, couleurs_jetons[partie.joueur1.symbole if partie.tour_joueur == 1 else partie.joueur2.symbole], (largeur_fenetre - 50, 50), 25)
+                pygame.display.flip()
+            clock.tick(60)
+    finally:
+        # Une recherche encore en cours (anticipation d'une partie terminée, retour au menu) ne doit pas continuer
+        # à occuper le processeur pendant les menus et les parties suivantes.
+        for recherche in (réflexion, anticipation):
+            if recherche is not None:
+                recherche.annuler()
 
 
 def main_multi():
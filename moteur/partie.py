@@ -2,8 +2,8 @@ from . import plateau
 
 class Partie:
 
-    def __init__(self, colonnes=7, lignes=6):
-        self.plateau = plateau.Plateau(colonnes, lignes)
+    def __init__(self, colonnes=7, lignes=6, classe_plateau=plateau.Plateau, alignement=4):
+        self.plateau = classe_plateau(colonnes, lignes, alignement=alignement)
         self.joueur1 = None
         self.joueur2 = None
         self.tour = 0
@@ -1,18 +1,65 @@
 import random
 
+from .zobrist import table_zobrist, table_zobrist_miroir
+from .plateau_bitboard import coups_tactiques, colonnes_gagnantes, tables_alignements, est_alignée
+
 class Plateau:
-    def __init__(self, colonnes=7, lignes=6, grille=None, colonnes_jouables=None, hauteurs_colonnes=None):
+    def __init__(self, colonnes=7, lignes=6, grille=None, colonnes_jouables=None, hauteurs_colonnes=None, hash=0,
+                 jetons=None, masque=0, alignement=4, hash_miroir=None):
         self.colonnes = colonnes
         self.lignes = lignes
+        # Nombre de jetons à aligner pour gagner.
+        self.alignement = alignement
+        self.hauteur = lignes + 1
         self.grille = self.construire_grille() if grille is None else grille
         self.colonnes_jouables = set(range(self.colonnes)) if colonnes_jouables is None else colonnes_jouables
         self.hauteurs_colonnes = [0] * self.colonnes if hauteurs_colonnes is None else hauteurs_colonnes
+        # Hash de Zobrist de la position, mis à jour à chaque coup joué ou annulé.
+        self.zobrist = table_zobrist(self.colonnes, self.lignes)
+        self.hash = hash
+        # Hash de la position symétrique, pour les clés canoniques des tables (voir Negamax5.negamax). Il n'est tenu
+        # à jour qu'après activer_miroir (ou avec hash_miroir donné) : les autres bots ne paient pas sa mise à jour.
+        self.zobrist_miroir = None if hash_miroir is None else table_zobrist_miroir(self.colonnes, self.lignes)
+        self.hash_miroir = hash_miroir
+        # Bitboards de chaque symbole et de tous les jetons (format de PlateauBitboard) pour les tests tactiques
+        # groupés (colonnes_gagnantes, coups_tactiques). Construits à la première de ces requêtes puis tenus à jour
+        # avec la grille : les bots qui ne s'en servent pas ne paient pas leur mise à jour.
+        self.jetons = jetons
+        self.masque = masque
+        # Lignes gagnantes passant par chaque case, partagées par tous les plateaux de même géométrie.
+        self.lignes_par_case = tables_alignements(colonnes, lignes, alignement)[0]
     def construire_grille(self):
         return [[] for _ in range(self.colonnes)]
 
     def copier_grille(self):
-        #without using colonne.copy
-        return Plateau(grille=[colonne.copy() for colonne in self.grille], colonnes=self.colonnes, lignes=self.lignes, colonnes_jouables=self.colonnes_jouables.copy(), hauteurs_colonnes=self.hauteurs_colonnes.copy())
+        # Sans repasser par __init__ : les tables partagées (Zobrist, alignements) sont reprises telles quelles.
+        # Les attributs sont recopiés un par un : passer par __dict__ ralentirait ensuite chaque accès à self.
+        copie = Plateau.__new__(Plateau)
+        copie.colonnes = self.colonnes
+        copie.lignes = self.lignes
+        copie.alignement = self.alignement
+        copie.hauteur = self.hauteur
+        copie.grille = [colonne.copy() for colonne in self.grille]
+        copie.colonnes_jouables = self.colonnes_jouables.copy()
+        copie.hauteurs_colonnes = self.hauteurs_colonnes.copy()
+        copie.zobrist = self.zobrist
+        copie.hash = self.hash
+        copie.zobrist_miroir = self.zobrist_miroir
+        copie.hash_miroir = self.hash_miroir
+        copie.jetons = None if self.jetons is None else self.jetons.copy()
+        copie.masque = self.masque
+        copie.lignes_par_case = self.lignes_par_case
+        return copie
+
+    def activer_miroir(self):
+        # Calcule le hash de la position symétrique et le tient à jour à partir de maintenant (copies comprises).
+        if self.zobrist_miroir is not None:
+            return
+        self.zobrist_miroir = table_zobrist_miroir(self.colonnes, self.lignes)
+        self.hash_miroir = 0
+        for colonne, cases in enumerate(self.grille):
+            for ligne, symbole in enumerate(cases):
+                self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
 
     def afficher(self):
         for ligne in range(self.lignes - 1, -1, -1):
@@ -23,6 +70,32 @@ class Plateau:
                     print(".", end=" ")
             print()
 
+    def construire_bitboards(self):
+        self.jetons, self.masque = {}, 0
+        for colonne, cases in enumerate(self.grille):
+            for ligne, jeton in enumerate(cases):
+                case = 1 << (colonne * self.hauteur + ligne)
+                self.masque |= case
+                self.jetons[jeton] = self.jetons.get(jeton, 0) | case
+
+    def bitboards(self, symbole):
+        # Même format que PlateauBitboard.bitboards.
+        if self.jetons is None:
+            self.construire_bitboards()
+        return self.jetons.get(symbole, 0), self.masque
+
+    def colonnes_gagnantes(self, symbole):
+        # Voir PlateauBitboard.colonnes_gagnantes.
+        if self.jetons is None:
+            self.construire_bitboards()
+        return colonnes_gagnantes(self.jetons.get(symbole, 0), self.masque, self.colonnes, self.lignes, self.alignement)
+
+    def coups_tactiques(self, symbole):
+        # Voir PlateauBitboard.coups_tactiques.
+        if self.jetons is None:
+            self.construire_bitboards()
+        return coups_tactiques(self.jetons.get(symbole, 0), self.masque, self.colonnes, self.lignes, self.alignement)
+
     def colonne_valide(self, colonne):
         return 0 <= colonne < self.colonnes
 
@@ -30,12 +103,20 @@ class Plateau:
         if colonne not in self.colonnes_jouables:
             return False
 
+        # Même mise à jour que jouer_coup_reversible, sans l'appel de méthode.
+        ligne = self.hauteurs_colonnes[colonne]
+        jetons = self.jetons
+        if jetons is not None:
+            case = 1 << (colonne * self.hauteur + ligne)
+            jetons[symbole] = jetons.get(symbole, 0) | case
+            self.masque |= case
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
         self.grille[colonne].append(symbole)
-        self.hauteurs_colonnes[colonne] += 1
-
-        if self.colonne_pleine(colonne):
+        self.hauteurs_colonnes[colonne] = ligne + 1
+        if ligne + 1 >= self.lignes:
             self.colonnes_jouables.remove(colonne)
-
         return True
 
     def colonne_pleine(self, colonne):
@@ -46,45 +127,56 @@ class Plateau:
 
 
     def est_victoire(self, colonne):
-        jeton = self.grille[colonne][-1]
         ligne = self.hauteurs_colonnes[colonne] - 1
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
-        for dx, dy in directions:
+        jeton = self.grille[colonne][ligne]
+        if self.jetons is not None:
+            # Seules les lignes qui passent par le dernier jeton de la colonne sont vérifiées.
+            return est_alignée(self.jetons[jeton], colonne * self.hauteur + ligne, self.lignes_par_case)
+
+        # Sans bitboards, on compte les jetons alignés de part et d'autre dans chaque direction.
+        for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
             compte = 1
-            x, y = colonne, ligne
-            while True:
-                x += dx
-                y += dy
-                if 0 <= x < self.colonnes and 0 <= y < self.hauteurs_colonnes[x] and self.grille[x][y] == jeton:
-                    compte += 1
-                else:
-                    break
-
-            x, y = colonne, ligne
-            while True:
-                x -= dx
-                y -= dy
-                if 0 <= x < self.colonnes and 0 <= y < self.hauteurs_colonnes[x] and self.grille[x][y] == jeton:
-                    compte += 1
-                else:
-                    break
-            if compte >= 4:
+            x, y = colonne + dx, ligne + dy
+            while 0 <= x < self.colonnes and 0 <= y < self.hauteurs_colonnes[x] and self.grille[x][y] == jeton:
+                compte += 1
+                x, y = x + dx, y + dy
+            x, y = colonne - dx, ligne - dy
+            while 0 <= x < self.colonnes and 0 <= y < self.hauteurs_colonnes[x] and self.grille[x][y] == jeton:
+                compte += 1
+                x, y = x - dx, y - dy
+            if compte >= self.alignement:
                 return True
         return False
 
     def jouer_coup_reversible(self, colonne, symbole):
+        ligne = self.hauteurs_colonnes[colonne]
+        jetons = self.jetons
+        if jetons is not None:
+            case = 1 << (colonne * self.hauteur + ligne)
+            jetons[symbole] = jetons.get(symbole, 0) | case
+            self.masque |= case
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
         self.grille[colonne].append(symbole)
-        self.hauteurs_colonnes[colonne] += 1
+        self.hauteurs_colonnes[colonne] = ligne + 1
 
-        colonne_est_enlevée = False
-        if self.colonne_pleine(colonne) and colonne in self.colonnes_jouables:
+        if ligne + 1 >= self.lignes and colonne in self.colonnes_jouables:
             self.colonnes_jouables.remove(colonne)
-            colonne_est_enlevée = True
-        return colonne_est_enlevée
+            return True
+        return False
 
     def annuler_coup(self, colonne, colonne_est_enlevée, symbole):
         self.grille[colonne].pop()
-        self.hauteurs_colonnes[colonne] -= 1
+        ligne = self.hauteurs_colonnes[colonne] - 1
+        self.hauteurs_colonnes[colonne] = ligne
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
+        if self.jetons is not None:
+            case = 1 << (colonne * self.hauteur + ligne)
+            self.jetons[symbole] ^= case
+            self.masque ^= case
 
         if colonne_est_enlevée:
             self.colonnes_jouables.add(colonne)
@@ -0,0 +1,268 @@
+from functools import lru_cache
+
+from .zobrist import table_zobrist, table_zobrist_miroir
+
+
+def positions_gagnantes(jetons, masque, hauteur, plateau_complet):
+    # Cases vides qui compléteraient un alignement de quatre pour `jetons`.
+    résultat = (jetons << 1) & (jetons << 2) & (jetons << 3)
+    for d in (hauteur, hauteur + 1, hauteur - 1):
+        paires = (jetons << d) & (jetons << 2 * d)
+        résultat |= paires & (jetons << 3 * d)
+        résultat |= paires & (jetons >> d)
+        paires = (jetons >> d) & (jetons >> 2 * d)
+        résultat |= paires & (jetons << d)
+        résultat |= paires & (jetons >> 3 * d)
+    return résultat & (plateau_complet ^ masque)
+
+
+def positions_gagnantes_lignes(jetons, masque, toutes_les_lignes, plateau_complet):
+    # Version pour un alignement quelconque : les cases vides qui sont les seules à manquer à une ligne gagnante.
+    résultat = 0
+    for ligne in toutes_les_lignes:
+        manquantes = ligne & ~jetons
+        if not manquantes & (manquantes - 1):
+            résultat |= manquantes
+    return résultat & (plateau_complet ^ masque)
+
+
+@lru_cache(maxsize=None)
+def tables_alignements(colonnes, lignes, alignement=4):
+    """
+    Lignes gagnantes d'une géométrie, calculées une seule fois : renvoie (pour chaque bit de case, le tuple des
+    masques des lignes de `alignement` cases qui passent par cette case ; le tuple de toutes les lignes).
+    """
+    hauteur = lignes + 1
+    par_case = [[] for _ in range(colonnes * hauteur)]
+    toutes_les_lignes = []
+    for colonne in range(colonnes):
+        for ligne in range(lignes):
+            for dc, dl in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                cases = [(colonne + k * dc, ligne + k * dl) for k in range(alignement)]
+                if all(0 <= x < colonnes and 0 <= y < lignes for x, y in cases):
+                    masque = sum(1 << (x * hauteur + y) for x, y in cases)
+                    toutes_les_lignes.append(masque)
+                    for x, y in cases:
+                        par_case[x * hauteur + y].append(masque)
+    return tuple(tuple(masques) for masques in par_case), tuple(toutes_les_lignes)
+
+
+def cases_gagnantes(jetons, masque, colonnes, lignes, alignement=4):
+    """Cases vides qui compléteraient un alignement pour `jetons`, pour n'importe quelle géométrie."""
+    bas, plateau_complet, masques_colonnes = masques_plateau(colonnes, lignes)
+    if alignement == 4:
+        return positions_gagnantes(jetons, masque, lignes + 1, plateau_complet)
+    return positions_gagnantes_lignes(jetons, masque, tables_alignements(colonnes, lignes, alignement)[1], plateau_complet)
+
+
+def est_alignée(jetons, case, lignes_par_case):
+    # Vrai si une des lignes gagnantes qui passent par `case` (numéro de bit) est remplie par `jetons`.
+    for ligne in lignes_par_case[case]:
+        if jetons & ligne == ligne:
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def masques_plateau(colonnes, lignes):
+    """Renvoie (bas de toutes les colonnes, toutes les cases du plateau, masque de chaque colonne)."""
+    hauteur = lignes + 1
+    colonne_pleine = (1 << lignes) - 1
+    bas = sum(1 << (colonne * hauteur) for colonne in range(colonnes))
+    return bas, bas * colonne_pleine, tuple(colonne_pleine << (colonne * hauteur) for colonne in range(colonnes))
+
+
+def colonnes_du_masque(cases, masques_colonnes):
+    # Bit c allumé si `cases` contient une case de la colonne c.
+    colonnes = 0
+    if cases:
+        for colonne, masque_colonne in enumerate(masques_colonnes):
+            if cases & masque_colonne:
+                colonnes |= 1 << colonne
+    return colonnes
+
+
+def colonnes_gagnantes(jetons, masque, colonnes, lignes, alignement=4):
+    """Masque des colonnes (bit c pour la colonne c) où un jeton de plus ferait gagner le joueur qui possède `jetons`."""
+    bas, plateau_complet, masques_colonnes = masques_plateau(colonnes, lignes)
+    possibles = (masque + bas) & plateau_complet
+    return colonnes_du_masque(possibles & cases_gagnantes(jetons, masque, colonnes, lignes, alignement), masques_colonnes)
+
+
+def coups_tactiques(jetons, masque, colonnes, lignes, alignement=4):
+    """
+    Renvoie (colonnes gagnantes, colonnes non perdantes) pour le joueur qui possède `jetons` et doit jouer,
+    sous forme de masques de colonnes (bit c pour la colonne c).
+    Un coup non perdant pare la menace adverse jouable s'il y en a une et ne se joue pas sous une case
+    qui ferait gagner l'adversaire. Aucune colonne non perdante : l'adversaire gagne au coup suivant.
+    """
+    bas, plateau_complet, masques_colonnes = masques_plateau(colonnes, lignes)
+    possibles = (masque + bas) & plateau_complet
+    gagnants = possibles & cases_gagnantes(jetons, masque, colonnes, lignes, alignement)
+    if gagnants:
+        return colonnes_du_masque(gagnants, masques_colonnes), 0
+
+    menaces_adverses = cases_gagnantes(jetons ^ masque, masque, colonnes, lignes, alignement)
+    forcés = possibles & menaces_adverses
+    if forcés:
+        if forcés & (forcés - 1):
+            # Deux menaces adverses à parer en même temps.
+            return 0, 0
+        possibles = forcés
+    return 0, colonnes_du_masque(possibles & ~(menaces_adverses >> 1), masques_colonnes)
+
+
+class PlateauBitboard:
+    """
+    Plateau stocké sous forme de deux bitboards : `position` contient les jetons du joueur qui a posé
+    le premier jeton (`symbole_position`) et `masque` contient tous les jetons.
+    Les jetons de l'autre joueur s'obtiennent avec `position ^ masque`.
+    Chaque colonne occupe `lignes + 1` bits (le bit du haut reste toujours vide et sert de sentinelle),
+    la case (colonne, ligne) correspond donc au bit `colonne * (lignes + 1) + ligne`.
+    Il faut aligner `alignement` jetons pour gagner.
+    """
+    def __init__(self, colonnes=7, lignes=6, position=0, masque=0, symboles=(None, None), colonnes_jouables=None, hauteurs_colonnes=None, hash=0,
+                 alignement=4, hash_miroir=None):
+        self.colonnes = colonnes
+        self.lignes = lignes
+        self.alignement = alignement
+        self.hauteur = lignes + 1
+        self.position = position
+        self.masque = masque
+        self.symbole_position, self.symbole_autre = symboles
+        self.colonnes_jouables = set(range(self.colonnes)) if colonnes_jouables is None else colonnes_jouables
+        self.hauteurs_colonnes = [0] * self.colonnes if hauteurs_colonnes is None else hauteurs_colonnes
+        self.zobrist = table_zobrist(self.colonnes, self.lignes)
+        self.hash = hash
+        # Hash de la position symétrique, tenu à jour seulement après activer_miroir (voir Plateau).
+        self.zobrist_miroir = None if hash_miroir is None else table_zobrist_miroir(self.colonnes, self.lignes)
+        self.hash_miroir = hash_miroir
+        self.bas = [1 << (colonne * self.hauteur) for colonne in range(self.colonnes)]
+        self.lignes_par_case = tables_alignements(colonnes, lignes, alignement)[0]
+
+    def copier_grille(self):
+        # Sans repasser par __init__ : les tables partagées sont reprises telles quelles.
+        # Les attributs sont recopiés un par un, comme dans Plateau.copier_grille.
+        copie = PlateauBitboard.__new__(PlateauBitboard)
+        copie.colonnes = self.colonnes
+        copie.lignes = self.lignes
+        copie.alignement = self.alignement
+        copie.hauteur = self.hauteur
+        copie.position = self.position
+        copie.masque = self.masque
+        copie.symbole_position = self.symbole_position
+        copie.symbole_autre = self.symbole_autre
+        copie.colonnes_jouables = self.colonnes_jouables.copy()
+        copie.hauteurs_colonnes = self.hauteurs_colonnes.copy()
+        copie.zobrist = self.zobrist
+        copie.hash = self.hash
+        copie.zobrist_miroir = self.zobrist_miroir
+        copie.hash_miroir = self.hash_miroir
+        copie.bas = self.bas
+        copie.lignes_par_case = self.lignes_par_case
+        return copie
+
+    def activer_miroir(self):
+        # Voir Plateau.activer_miroir.
+        if self.zobrist_miroir is not None:
+            return
+        self.zobrist_miroir = table_zobrist_miroir(self.colonnes, self.lignes)
+        self.hash_miroir = 0
+        for colonne in range(self.colonnes):
+            for ligne in range(self.hauteurs_colonnes[colonne]):
+                self.hash_miroir ^= self.zobrist_miroir[self.symbole_en(colonne, ligne)][colonne][ligne]
+
+    def bitboards(self, symbole):
+        """Renvoie (jetons de `symbole`, tous les jetons) au format décrit plus haut."""
+        if symbole == self.symbole_position:
+            return self.position, self.masque
+        if self.symbole_position is None:
+            return 0, self.masque
+        return self.position ^ self.masque, self.masque
+
+    def colonnes_gagnantes(self, symbole):
+        """Masque des colonnes jouables qui feraient gagner `symbole` tout de suite (bit c pour la colonne c)."""
+        jetons, masque = self.bitboards(symbole)
+        return colonnes_gagnantes(jetons, masque, self.colonnes, self.lignes, self.alignement)
+
+    def coups_tactiques(self, symbole):
+        # Voir la fonction coups_tactiques.
+        jetons, masque = self.bitboards(symbole)
+        return coups_tactiques(jetons, masque, self.colonnes, self.lignes, self.alignement)
+
+    def symbole_en(self, colonne, ligne):
+        case = self.bas[colonne] << ligne
+        if not self.masque & case:
+            return None
+        return self.symbole_position if self.position & case else self.symbole_autre
+
+    @property
+    def grille(self):
+        # Vue en listes pour le code qui lit encore plateau.grille[colonne][ligne] (affichage, anciens bots).
+        return [[self.symbole_en(colonne, ligne) for ligne in range(self.hauteurs_colonnes[colonne])]
+                for colonne in range(self.colonnes)]
+
+    def afficher(self):
+        for ligne in range(self.lignes - 1, -1, -1):
+            for colonne in range(self.colonnes):
+                if ligne < self.hauteurs_colonnes[colonne]:
+                    print(self.symbole_en(colonne, ligne), end=" ")
+                else:
+                    print(".", end=" ")
+            print()
+
+    def colonne_valide(self, colonne):
+        return 0 <= colonne < self.colonnes
+
+    def ajouter_jeton(self, colonne, symbole):
+        if colonne not in self.colonnes_jouables:
+            return False
+
+        self.jouer_coup_reversible(colonne, symbole)
+        return True
+
+    def colonne_pleine(self, colonne):
+        return self.hauteurs_colonnes[colonne] >= self.lignes
+
+    def est_nul(self):
+        return len(self.colonnes_jouables) == 0
+
+    def est_victoire(self, colonne):
+        case = colonne * self.hauteur + self.hauteurs_colonnes[colonne] - 1
+        jetons = self.position if self.position >> case & 1 else self.position ^ self.masque
+        return est_alignée(jetons, case, self.lignes_par_case)
+
+    def jouer_coup_reversible(self, colonne, symbole):
+        ligne = self.hauteurs_colonnes[colonne]
+        case = self.bas[colonne] << ligne
+        if symbole == self.symbole_position:
+            self.position |= case
+        elif self.symbole_position is None:
+            self.symbole_position = symbole
+            self.position = case
+        elif self.symbole_autre is None:
+            self.symbole_autre = symbole
+        self.masque |= case
+        self.hauteurs_colonnes[colonne] = ligne + 1
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
+
+        if ligne + 1 >= self.lignes and colonne in self.colonnes_jouables:
+            self.colonnes_jouables.remove(colonne)
+            return True
+        return False
+
+    def annuler_coup(self, colonne, colonne_est_enlevée, symbole):
+        ligne = self.hauteurs_colonnes[colonne] - 1
+        case = self.bas[colonne] << ligne
+        if symbole == self.symbole_position:
+            self.position ^= case
+        self.masque ^= case
+        self.hauteurs_colonnes[colonne] = ligne
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
+
+        if colonne_est_enlevée:
+            self.colonnes_jouables.add(colonne)
@@ -0,0 +1,198 @@
+from functools import lru_cache
+
+from .zobrist import table_zobrist, table_zobrist_miroir
+from .plateau_bitboard import coups_tactiques, colonnes_gagnantes, tables_alignements, est_alignée
+
+
+@lru_cache(maxsize=None)
+def colonnes_par_masque(colonnes):
+    # Pour chaque masque de colonnes jouables, le tuple des colonnes correspondantes.
+    return tuple(tuple(colonne for colonne in range(colonnes) if masque >> colonne & 1) for masque in range(1 << colonnes))
+
+
+class PlateauCompact:
+    """
+    Plateau de taille fixe, sans dictionnaire d'instance. Un seul bytearray contient la grille, colonne après
+    colonne (`lignes` cases par colonne, 0 pour une case vide, 1 ou 2 pour le premier ou le second symbole joué),
+    suivie de la hauteur de chaque colonne. Les colonnes jouables sont un masque (bit c pour la colonne c)
+    et les bitboards des deux symboles sont tenus à jour comme dans Plateau.
+    Copier le plateau ne recopie qu'un tampon et quelques entiers.
+    """
+    __slots__ = ("colonnes", "lignes", "alignement", "hauteur", "tampon", "hauteurs_colonnes", "jouables", "symboles",
+                 "jetons1", "jetons2", "masque", "zobrist", "hash", "tuples_jouables", "lignes_par_case",
+                 "zobrist_miroir", "hash_miroir")
+
+    def __init__(self, colonnes=7, lignes=6, tampon=None, jouables=None, symboles=(None, None, None),
+                 jetons1=0, jetons2=0, masque=0, hash=0, alignement=4, hash_miroir=None):
+        self.colonnes = colonnes
+        self.lignes = lignes
+        self.alignement = alignement
+        self.hauteur = lignes + 1
+        self.tampon = bytearray(colonnes * lignes + colonnes) if tampon is None else tampon
+        # Vue sur la fin du tampon : hauteurs_colonnes[colonne] se lit et s'écrit comme une liste.
+        self.hauteurs_colonnes = memoryview(self.tampon)[colonnes * lignes:]
+        self.jouables = (1 << colonnes) - 1 if jouables is None else jouables
+        self.symboles = symboles
+        self.jetons1 = jetons1
+        self.jetons2 = jetons2
+        self.masque = masque
+        self.zobrist = table_zobrist(colonnes, lignes)
+        self.hash = hash
+        # Hash de la position symétrique, tenu à jour seulement après activer_miroir (voir Plateau).
+        self.zobrist_miroir = None if hash_miroir is None else table_zobrist_miroir(colonnes, lignes)
+        self.hash_miroir = hash_miroir
+        self.tuples_jouables = colonnes_par_masque(colonnes)
+        self.lignes_par_case = tables_alignements(colonnes, lignes, alignement)[0]
+
+    def __reduce__(self):
+        # La vue mémoire ne se sérialise pas : on reconstruit le plateau à partir du tampon.
+        return (PlateauCompact, (self.colonnes, self.lignes, bytearray(self.tampon), self.jouables, self.symboles,
+                                 self.jetons1, self.jetons2, self.masque, self.hash, self.alignement,
+                                 self.hash_miroir))
+
+    def copier_grille(self):
+        # Sans repasser par __init__ : les tables partagées sont reprises telles quelles.
+        copie = PlateauCompact.__new__(PlateauCompact)
+        copie.colonnes = self.colonnes
+        copie.lignes = self.lignes
+        copie.alignement = self.alignement
+        copie.hauteur = self.hauteur
+        copie.tampon = tampon = bytearray(self.tampon)
+        copie.hauteurs_colonnes = memoryview(tampon)[self.colonnes * self.lignes:]
+        copie.jouables = self.jouables
+        copie.symboles = self.symboles
+        copie.jetons1 = self.jetons1
+        copie.jetons2 = self.jetons2
+        copie.masque = self.masque
+        copie.zobrist = self.zobrist
+        copie.hash = self.hash
+        copie.zobrist_miroir = self.zobrist_miroir
+        copie.hash_miroir = self.hash_miroir
+        copie.tuples_jouables = self.tuples_jouables
+        copie.lignes_par_case = self.lignes_par_case
+        return copie
+
+    def activer_miroir(self):
+        # Voir Plateau.activer_miroir.
+        if self.zobrist_miroir is not None:
+            return
+        self.zobrist_miroir = table_zobrist_miroir(self.colonnes, self.lignes)
+        self.hash_miroir = 0
+        for colonne in range(self.colonnes):
+            for ligne in range(self.hauteurs_colonnes[colonne]):
+                symbole = self.symboles[self.tampon[colonne * self.lignes + ligne]]
+                self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
+
+    @property
+    def colonnes_jouables(self):
+        return self.tuples_jouables[self.jouables]
+
+    def code(self, symbole):
+        # Numéro (1 ou 2) du symbole dans la grille, attribué au premier jeton posé.
+        if symbole == self.symboles[1]:
+            return 1
+        if symbole == self.symboles[2]:
+            return 2
+        if self.symboles[1] is None:
+            self.symboles = (None, symbole, None)
+            return 1
+        self.symboles = (None, self.symboles[1], symbole)
+        return 2
+
+    def bitboards(self, symbole):
+        # Même format que PlateauBitboard.bitboards.
+        if symbole == self.symboles[1]:
+            return self.jetons1, self.masque
+        if symbole == self.symboles[2]:
+            return self.jetons2, self.masque
+        return 0, self.masque
+
+    def colonnes_gagnantes(self, symbole):
+        # Voir PlateauBitboard.colonnes_gagnantes.
+        jetons, masque = self.bitboards(symbole)
+        return colonnes_gagnantes(jetons, masque, self.colonnes, self.lignes, self.alignement)
+
+    def coups_tactiques(self, symbole):
+        # Voir PlateauBitboard.coups_tactiques.
+        jetons, masque = self.bitboards(symbole)
+        return coups_tactiques(jetons, masque, self.colonnes, self.lignes, self.alignement)
+
+    @property
+    def grille(self):
+        # Vue en listes pour le code qui lit plateau.grille[colonne][ligne].
+        return [[self.symboles[self.tampon[colonne * self.lignes + ligne]] for ligne in range(self.hauteurs_colonnes[colonne])]
+                for colonne in range(self.colonnes)]
+
+    def afficher(self):
+        for ligne in range(self.lignes - 1, -1, -1):
+            for colonne in range(self.colonnes):
+                if ligne < self.hauteurs_colonnes[colonne]:
+                    print(self.symboles[self.tampon[colonne * self.lignes + ligne]], end=" ")
+                else:
+                    print(".", end=" ")
+            print()
+
+    def colonne_valide(self, colonne):
+        return 0 <= colonne < self.colonnes
+
+    def ajouter_jeton(self, colonne, symbole):
+        if colonne < 0 or not self.jouables >> colonne & 1:
+            return False
+
+        self.jouer_coup_reversible(colonne, symbole)
+        return True
+
+    def colonne_pleine(self, colonne):
+        return self.hauteurs_colonnes[colonne] >= self.lignes
+
+    def est_nul(self):
+        return not self.jouables
+
+    def est_victoire(self, colonne):
+        ligne = self.hauteurs_colonnes[colonne] - 1
+        jetons = self.jetons1 if self.tampon[colonne * self.lignes + ligne] == 1 else self.jetons2
+        return est_alignée(jetons, colonne * self.hauteur + ligne, self.lignes_par_case)
+
+    def jouer_coup_reversible(self, colonne, symbole):
+        ligne = self.hauteurs_colonnes[colonne]
+        case = 1 << (colonne * self.hauteur + ligne)
+        symboles = self.symboles
+        if symbole == symboles[1]:
+            self.tampon[colonne * self.lignes + ligne] = 1
+            self.jetons1 |= case
+        elif symbole == symboles[2]:
+            self.tampon[colonne * self.lignes + ligne] = 2
+            self.jetons2 |= case
+        elif self.code(symbole) == 1:
+            self.tampon[colonne * self.lignes + ligne] = 1
+            self.jetons1 |= case
+        else:
+            self.tampon[colonne * self.lignes + ligne] = 2
+            self.jetons2 |= case
+        self.hauteurs_colonnes[colonne] = ligne + 1
+        self.masque |= case
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
+
+        if ligne + 1 >= self.lignes:
+            self.jouables &= ~(1 << colonne)
+            return True
+        return False
+
+    def annuler_coup(self, colonne, colonne_est_enlevée, symbole):
+        ligne = self.hauteurs_colonnes[colonne] - 1
+        case = 1 << (colonne * self.hauteur + ligne)
+        if self.tampon[colonne * self.lignes + ligne] == 1:
+            self.jetons1 ^= case
+        else:
+            self.jetons2 ^= case
+        self.masque ^= case
+        self.tampon[colonne * self.lignes + ligne] = 0
+        self.hauteurs_colonnes[colonne] = ligne
+        self.hash ^= self.zobrist[symbole][colonne][ligne]
+        if self.zobrist_miroir is not None:
+            self.hash_miroir ^= self.zobrist_miroir[symbole][colonne][ligne]
+
+        if colonne_est_enlevée:
+            self.jouables |= 1 << colonne
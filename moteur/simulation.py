@@ -0,0 +1,146 @@
+import numpy as np
+
+# Simulation vectorisée de nombreuses parties à la fois avec NumPy, pour générer des données ou mesurer
+# des bots simples sur des millions de parties. Chaque plateau est stocké sous forme de bitboards
+# (même format de bits que PlateauBitboard) dans des tableaux de N entiers de 64 bits.
+
+EN_COURS = -1
+NUL = 0
+
+
+class SimulateurParLots:
+    """
+    N parties jouées en parallèle, un coup par plateau à chaque étape. Le joueur 1 commence partout,
+    c'est donc au joueur 1 aux étapes paires et au joueur 2 aux étapes impaires.
+    résultats vaut EN_COURS, NUL, 1 ou 2 (numéro du gagnant) ; coups garde les colonnes jouées (-1 après la fin).
+    """
+    def __init__(self, nb_parties, colonnes=7, lignes=6, alignement=4):
+        if colonnes * (lignes + 1) > 64:
+            raise ValueError("Le plateau ne tient pas dans un entier de 64 bits")
+        self.nb_parties = nb_parties
+        self.colonnes = colonnes
+        self.lignes = lignes
+        self.alignement = alignement
+        self.hauteur = lignes + 1
+        self.hauteurs = np.zeros((nb_parties, colonnes), dtype=np.int64)
+        self.jetons = np.zeros((2, nb_parties), dtype=np.uint64)
+        self.masque = np.zeros(nb_parties, dtype=np.uint64)
+        self.résultats = np.full(nb_parties, EN_COURS, dtype=np.int8)
+        self.nb_coups = np.zeros(nb_parties, dtype=np.int16)
+        self.coups = np.full((nb_parties, colonnes * lignes), -1, dtype=np.int8)
+        self.étape = 0
+        # Décalage du bit du bas de chaque colonne.
+        self.bas_colonnes = np.arange(colonnes, dtype=np.uint64) * np.uint64(self.hauteur)
+
+    @property
+    def joueur(self):
+        # Indice (0 ou 1) du joueur qui doit jouer.
+        return self.étape % 2
+
+    def en_cours(self):
+        return self.résultats == EN_COURS
+
+    def terminé(self):
+        return not self.en_cours().any()
+
+    def colonnes_jouables(self):
+        """Tableau booléen (N, colonnes) des colonnes qui ne sont pas pleines."""
+        return self.hauteurs < self.lignes
+
+    def cases_suivantes(self):
+        """Tableau (N, colonnes) du bit de la case où tomberait un jeton dans chaque colonne (0 si pleine)."""
+        bits = np.left_shift(np.uint64(1), self.bas_colonnes + self.hauteurs.astype(np.uint64))
+        return np.where(self.colonnes_jouables(), bits, np.uint64(0))
+
+    def alignements(self, jetons):
+        """Vrai là où `jetons` (tableau de bitboards de forme quelconque) contient `alignement` jetons alignés."""
+        gagné = np.zeros(jetons.shape, dtype=bool)
+        for d in (1, self.hauteur, self.hauteur + 1, self.hauteur - 1):
+            # Après la boucle, un bit de suites est à 1 au départ de chaque suite de `longueur` jetons :
+            # la longueur double tant que possible, puis le dernier décalage complète jusqu'à `alignement`.
+            suites, longueur = jetons, 1
+            while 2 * longueur <= self.alignement:
+                suites = suites & (suites >> np.uint64(longueur * d))
+                longueur *= 2
+            if longueur < self.alignement:
+                suites = suites & (suites >> np.uint64((self.alignement - longueur) * d))
+            gagné |= suites != 0
+        return gagné
+
+    def coups_gagnants(self, indice_joueur):
+        """Tableau booléen (N, colonnes) des colonnes qui feraient gagner le joueur `indice_joueur` tout de suite."""
+        cases = self.cases_suivantes()
+        return self.alignements(self.jetons[indice_joueur][:, None] | cases) & (cases != 0)
+
+    def jouer(self, colonnes_choisies):
+        """Joue colonnes_choisies[i] sur chaque plateau en cours ; un coup dans une colonne pleine fait perdre."""
+        actifs = self.en_cours()
+        lignes_actives = np.nonzero(actifs)[0]
+        colonnes_choisies = np.asarray(colonnes_choisies, dtype=np.int64)[lignes_actives]
+        joueur = self.joueur
+
+        hauteurs = self.hauteurs[lignes_actives, colonnes_choisies]
+        invalides = hauteurs >= self.lignes
+        bits = np.left_shift(np.uint64(1), self.bas_colonnes[colonnes_choisies] + hauteurs.astype(np.uint64))
+        bits[invalides] = 0
+
+        self.jetons[joueur, lignes_actives] |= bits
+        self.masque[lignes_actives] |= bits
+        self.hauteurs[lignes_actives, colonnes_choisies] = np.minimum(hauteurs + 1, self.lignes)
+        self.coups[lignes_actives, self.nb_coups[lignes_actives]] = colonnes_choisies
+        self.nb_coups[lignes_actives] += 1
+
+        gagnés = self.alignements(self.jetons[joueur, lignes_actives])
+        pleins = self.nb_coups[lignes_actives] == self.colonnes * self.lignes
+        résultats = np.full(len(lignes_actives), EN_COURS, dtype=np.int8)
+        résultats[pleins] = NUL
+        résultats[gagnés] = joueur + 1
+        résultats[invalides] = 2 - joueur
+        self.résultats[lignes_actives] = résultats
+        self.étape += 1
+
+
+def politique_aléatoire(simulateur, générateur):
+    # Une colonne jouable au hasard, uniformément.
+    clés = générateur.random((simulateur.nb_parties, simulateur.colonnes))
+    return np.where(simulateur.colonnes_jouables(), clés, -1.0).argmax(axis=1)
+
+
+def politique_centre(simulateur, générateur):
+    # Une colonne jouable au hasard, avec un poids de plus en plus grand vers le centre.
+    centre = simulateur.colonnes // 2
+    poids = (centre + 1 - np.abs(np.arange(simulateur.colonnes) - centre)).astype(np.float64)
+    cumul = np.cumsum(simulateur.colonnes_jouables() * poids, axis=1)
+    tirage = générateur.random(simulateur.nb_parties) * cumul[:, -1]
+    return np.minimum((cumul <= tirage[:, None]).sum(axis=1), simulateur.colonnes - 1)
+
+
+def politique_tactique(simulateur, générateur, politique_de_repli=politique_centre):
+    # Gagne si possible, sinon bloque un coup gagnant de l'adversaire, sinon suit politique_de_repli.
+    choix = politique_de_repli(simulateur, générateur)
+    bloquants = simulateur.coups_gagnants(1 - simulateur.joueur)
+    gagnants = simulateur.coups_gagnants(simulateur.joueur)
+    for coups in (bloquants, gagnants):
+        trouvé = coups.any(axis=1)
+        choix = np.where(trouvé, coups.argmax(axis=1), choix)
+    return choix
+
+
+def simuler(nb_parties, politique1=politique_aléatoire, politique2=None, colonnes=7, lignes=6, graine=None, alignement=4):
+    """
+    Joue nb_parties parties entre deux politiques (politique(simulateur, générateur) -> tableau de N colonnes)
+    et renvoie le simulateur terminé : voir résultats, nb_coups et coups.
+    """
+    politiques = (politique1, politique1 if politique2 is None else politique2)
+    générateur = np.random.default_rng(graine)
+    simulateur = SimulateurParLots(nb_parties, colonnes, lignes, alignement)
+    while not simulateur.terminé():
+        simulateur.jouer(politiques[simulateur.joueur](simulateur, générateur))
+    return simulateur
+
+
+def bilan(simulateur):
+    """Renvoie {"joueur1": victoires, "joueur2": victoires, "nul": nulles}."""
+    résultats = simulateur.résultats
+    return {"joueur1": int((résultats == 1).sum()), "joueur2": int((résultats == 2).sum()),
+            "nul": int((résultats == NUL).sum())}
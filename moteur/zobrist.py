@@ -0,0 +1,51 @@
+import random
+from functools import lru_cache
+
+
+class TableZobrist(dict):
+    """
+    Associe à chaque symbole une valeur aléatoire de 64 bits par case : table[symbole][colonne][ligne].
+    Les valeurs sont tirées avec une graine fixe, les clés restent donc identiques d'un processus à l'autre.
+    """
+    def __init__(self, colonnes, lignes):
+        super().__init__()
+        self.colonnes = colonnes
+        self.lignes = lignes
+
+    def __missing__(self, symbole):
+        aléatoire = random.Random(f"zobrist:{self.colonnes}x{self.lignes}:{symbole}")
+        valeurs = [[aléatoire.getrandbits(64) for _ in range(self.lignes)] for _ in range(self.colonnes)]
+        self[symbole] = valeurs
+        return valeurs
+
+
+@lru_cache(maxsize=None)
+def table_zobrist(colonnes, lignes):
+    # Une seule table par taille de plateau, partagée par tous les plateaux.
+    return TableZobrist(colonnes, lignes)
+
+
+class TableZobristMiroir(dict):
+    """
+    Valeurs de Zobrist de la position symétrique (gauche-droite) : miroir[symbole][colonne][ligne] vaut
+    table[symbole][colonnes - 1 - colonne][ligne]. Le hash miroir se tient à jour comme le hash, au même coût.
+    """
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def __missing__(self, symbole):
+        valeurs = self.table[symbole][::-1]
+        self[symbole] = valeurs
+        return valeurs
+
+
+@lru_cache(maxsize=None)
+def table_zobrist_miroir(colonnes, lignes):
+    return TableZobristMiroir(table_zobrist(colonnes, lignes))
+
+
+@lru_cache(maxsize=None)
+def trait(symbole):
+    # Valeur à combiner avec le hash du plateau pour distinguer le joueur qui doit jouer.
+    return random.Random(f"zobrist:trait:{symbole}").getrandbits(64)
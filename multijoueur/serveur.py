@@ -5,9 +5,11 @@ import time
 from ..utils import status_serveur
 
 class Serveur:
-    def __init__(self, ip='0.0.0.0', port=25565):
+    def __init__(self, ip='0.0.0.0', port=25565, graine=None):
         self.ip = ip
         self.port = port
+        # Tirage du joueur qui commence, reproductible avec une graine.
+        self.aléatoire = random.Random(graine)
         self.socket_serveur = None
         self.clients = {}
 
@@ -52,7 +54,7 @@ class Serveur:
                     self.clients[nom_utilisateur] = socket_client
                     connecté = True
                     if len(self.clients) == 2:
-                        on_commence = random.choice([True, False])
+                        on_commence = self.aléatoire.choice([True, False])
                         j1_tour = 1 if on_commence else 2
                         j2_tour = 2 if on_commence else 1
                         autre_utilisateur = [client for client in self.clients if client != nom_utilisateur][0]
@@ -1,6 +1,9 @@
 import random
-from bots import negamax, negamaxv3, negamaxv5, negamaxv4
+from bots import negamax, negamaxv2, negamaxv3, negamaxv5, negamaxv4, negamax_parallele, mcts, random_bot
 import moteur.plateau as plateau
+import moteur.plateau_bitboard as plateau_bitboard
+import moteur.plateau_compact as plateau_compact
+import moteur.simulation as simulation
 import time
 
 from moteur.joueur import Joueur
@@ -65,6 +68,96 @@ def coups_en_x_secondes_avec_victoire(PlateauClass, duration=0.1):
     return moves
 
 
+# Comparaison du plateau en listes, du plateau bitboard et du plateau compact
+def comparer_plateaux(durée=1):
+    versions = {"Version Liste": plateau.Plateau, "Version Bitboard": plateau_bitboard.PlateauBitboard,
+                "Version Compacte": plateau_compact.PlateauCompact}
+    print(f"\nTest du nombre de coups en {durée} seconde sans vérification de victoire :")
+    for nom, PlateauClass in versions.items():
+        print(f"{nom} : {coups_en_x_secondes_sans_victoire(PlateauClass, duration=durée)} coups/s")
+    print(f"\nTest du nombre de coups en {durée} seconde avec vérification de victoire :")
+    for nom, PlateauClass in versions.items():
+        print(f"{nom} : {coups_en_x_secondes_avec_victoire(PlateauClass, duration=durée)} coups/s")
+
+
+# Copies de plateau (utilisées à chaque nœud par Negamax, Negamax2 et Negamax3) et Negamax2 sur chaque plateau
+def comparer_copies(iterations=100000, profondeur=6):
+    versions = {"Version Liste": plateau.Plateau, "Version Compacte": plateau_compact.PlateauCompact}
+    for nom, PlateauClass in versions.items():
+        p = PlateauClass()
+        for colonne in (3, 3, 2, 4, 1, 2, 5):
+            p.ajouter_jeton(colonne, "X" if p.hash % 2 else "O")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            p.copier_grille()
+        durée_copies = time.perf_counter() - start
+
+        partie = Partie(classe_plateau=PlateauClass)
+        bot = negamaxv2.Negamax2("P2", "X", profondeur=profondeur)
+        start = time.perf_counter()
+        bot.trouver_coup(partie.plateau, Joueur("P1", "O"))
+        print(f"{nom} : {iterations} copies en {durée_copies:.3f} s, Negamax2 profondeur {profondeur} en {time.perf_counter() - start:.3f} s")
+
+
+# Hash miroir tenu à jour (comme avant, pour tous les plateaux) ou seulement après activer_miroir : copies et cycles
+# coup joué, victoire testée, coup annulé, puis Negamax2 qui n'utilise pas le miroir
+def comparer_miroir(iterations=100000, profondeur=6):
+    versions = {"Version Liste": plateau.Plateau, "Version Bitboard": plateau_bitboard.PlateauBitboard,
+                "Version Compacte": plateau_compact.PlateauCompact}
+    for nom, PlateauClass in versions.items():
+        for miroir in (True, False):
+            p = PlateauClass()
+            if miroir:
+                p.activer_miroir()
+            for colonne in (3, 3, 2, 4, 1, 2, 5):
+                p.ajouter_jeton(colonne, "X" if p.hash % 2 else "O")
+            start = time.perf_counter()
+            for _ in range(iterations):
+                p.copier_grille()
+            durée_copies = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(iterations):
+                colonne = i % p.colonnes
+                enlevée = p.jouer_coup_reversible(colonne, "X")
+                p.est_victoire(colonne)
+                p.annuler_coup(colonne, enlevée, "X")
+            durée_cycles = time.perf_counter() - start
+
+            partie = Partie(classe_plateau=PlateauClass)
+            if miroir:
+                partie.plateau.activer_miroir()
+            bot = negamaxv2.Negamax2("P2", "X", profondeur=profondeur)
+            start = time.perf_counter()
+            bot.trouver_coup(partie.plateau, Joueur("P1", "O"))
+            print(f"{nom}, miroir {'toujours tenu' if miroir else 'à la demande'} : {iterations} copies en "
+                  f"{durée_copies:.3f} s, {iterations} cycles en {durée_cycles:.3f} s, "
+                  f"Negamax2 profondeur {profondeur} en {time.perf_counter() - start:.3f} s")
+
+# Colonnes gagnantes d'une position : un coup joué et annulé par colonne, ou colonnes_gagnantes en un appel
+def comparer_colonnes_gagnantes(iterations=100000):
+    for nom, PlateauClass in {"Version Liste": plateau.Plateau, "Version Bitboard": plateau_bitboard.PlateauBitboard}.items():
+        p = PlateauClass()
+        for colonne, symbole in ((3, "X"), (3, "O"), (2, "X"), (4, "O"), (1, "X"), (2, "O")):
+            p.ajouter_jeton(colonne, symbole)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            gagnantes = []
+            for colonne in list(p.colonnes_jouables):
+                colonne_est_enlevée = p.jouer_coup_reversible(colonne, "X")
+                if p.est_victoire(colonne):
+                    gagnantes.append(colonne)
+                p.annuler_coup(colonne, colonne_est_enlevée, "X")
+        durée_coups = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            p.colonnes_gagnantes("X")
+        durée_groupée = time.perf_counter() - start
+        print(f"{nom} : {durée_coups:.3f} s en jouant chaque coup, {durée_groupée:.3f} s avec colonnes_gagnantes")
+
+
 # # Nombre de Coups en X secondes sans vérification de victoire
 # durées = [0.1, 1, 10]
 # for durée in durées:
@@ -117,21 +210,129 @@ def coups_en_x_secondes_avec_victoire(PlateauClass, duration=0.1):
 #     print(f".copy(): {end - start:.8f} sec en {it} itérations")
 
 # Test de Performance de Negamax
-def test_negamax(bot: negamax.Negamax):
+def test_negamax(bot: negamax.Negamax, classe_plateau=plateau.Plateau):
     profondeurs = [4, 5, 6, 7, 8, 9, 10, 11, 12] # , 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28,29,30, 31,32, 32, 33,34,35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45]
     for p in profondeurs:
-        partie = Partie()
+        partie = Partie(classe_plateau=classe_plateau)
         j1 = Joueur("P1", "O")
         partie.ajouter_joueur(bot)
         partie.ajouter_joueur(j1)
         bot.profondeur = p
+        # Table vide à chaque profondeur pour ne pas profiter de la recherche précédente.
+        bot.table_de_transposition = None
         start_time = time.perf_counter()
         bot.trouver_coup(partie.plateau, j1)
         print(f"Profondeur {p} atteint en {time.perf_counter()-start_time} secondes avec {bot.coups} positions explorées.")
 
 
-bot = negamaxv5.Negamax5("P2", "X")
+# Accélération de la recherche parallèle par rapport à Negamax5, à profondeur fixe sur les positions de test_negamax
+def comparer_parallele(travailleurs=4, profondeurs=(6, 7, 8, 9, 10)):
+    j1 = Joueur("P1", "O")
+    séquentiel = negamaxv5.Negamax5("P2", "X")
+    parallèle = negamax_parallele.NegamaxParallele("P2", "X", travailleurs=travailleurs)
+    for p in profondeurs:
+        durées = []
+        for bot in (séquentiel, parallèle):
+            partie = Partie()
+            bot.profondeur = p
+            if bot.table_de_transposition is not None:
+                bot.table_de_transposition.vider()
+            start_time = time.perf_counter()
+            bot.trouver_coup(partie.plateau, j1)
+            durées.append(time.perf_counter() - start_time)
+        print(f"Profondeur {p} : {durées[0]:.3f} s en séquentiel, {durées[1]:.3f} s avec {travailleurs} travailleurs, accélération x{durées[0] / durées[1]:.2f}")
+    parallèle.fermer()
+
+
+# Positions explorées avec l'ordre des coups par historique, et avec le simple tri par le centre
+def comparer_ordre_coups(profondeurs=(6, 7, 8, 9, 10), parties=10, coups_joués=8):
+    aléa = random.Random(0)
+    positions = []
+    for _ in range(parties):
+        partie = Partie()
+        symbole = "X"
+        for _ in range(coups_joués):
+            colonne = aléa.choice(list(partie.plateau.colonnes_jouables))
+            partie.plateau.ajouter_jeton(colonne, symbole)
+            symbole = "O" if symbole == "X" else "X"
+            if partie.plateau.est_victoire(colonne):
+                break
+        else:
+            positions.append((partie.plateau, symbole))
+    for p in profondeurs:
+        totaux = {}
+        for ordre in ("centre", "historique"):
+            totaux[ordre] = 0
+            for position, symbole in positions:
+                bot = negamaxv5.Negamax5("P2", symbole, profondeur=p, ordre_coups=ordre)
+                bot.trouver_coup(position, Joueur("P1", "O" if symbole == "X" else "X"))
+                totaux[ordre] += bot.coups
+        écart = totaux['historique'] / totaux['centre'] - 1
+        print(f"Profondeur {p} : {totaux['centre']} positions triées par le centre, {totaux['historique']} avec l'historique "
+              f"({100 * abs(écart):.0f} % {'en plus' if écart > 0 else 'en moins'})")
+
+
+# Parties aléatoires par seconde du bot MCTS depuis la position de départ
+def test_mcts(durées=(0.1, 1, 3)):
+    j1 = Joueur("P1", "O")
+    for durée in durées:
+        bot = mcts.MCTS("P2", "X", temps_max=durée)
+        bot.trouver_coup(Partie().plateau, j1)
+        print(f"{durée} s : {bot.coups} parties aléatoires, {bot.simulations_par_seconde:.0f} parties/s")
+
+
+# Parties par seconde entre bots aléatoires : une partie à la fois avec tournoi.une_partie, ou toutes à la fois avec NumPy
+def comparer_simulation(parties=10000):
+    from tournoi import une_partie
+    bot1, bot2 = random_bot.RandomBot("P1", "X"), random_bot.RandomBot("P2", "O")
+    start_time = time.perf_counter()
+    for i in range(parties // 10):
+        une_partie(bot1, bot2, 0)
+    durée = time.perf_counter() - start_time
+    print(f"Une partie à la fois : {parties // 10 / durée:.0f} parties/s")
+    for politique in (simulation.politique_aléatoire, simulation.politique_centre, simulation.politique_tactique):
+        start_time = time.perf_counter()
+        résultat = simulation.simuler(parties, politique)
+        durée = time.perf_counter() - start_time
+        print(f"Vectorisé ({politique.__name__}) : {parties / durée:.0f} parties/s, {simulation.bilan(résultat)}")
+
+
+# Une partie enregistrée dans un journal de tournoi est rejouée coup pour coup à l'identique
+def test_rejouer(parties=4):
+    import os
+    import tempfile
+    from bots import evaluation
+    from tournoi import tournoi, rejouer, lire_journal
+    bot1 = ("bots.negamaxv5.Negamax5", {"nom": "Negamax5 p1", "symbole": "X", "profondeur": 1})
+    bot2 = ("bots.negamaxv5.Negamax5", {"nom": "Negamax5 p6", "symbole": "O", "profondeur": 6, "menaces": True,
+                                        "evaluation": evaluation.evaluation_menaces})
+    dossier = tempfile.mkdtemp()
+    journal = os.path.join(dossier, "journal.jsonl")
+    tournoi(bot1, bot2, parties, max_workers=2, journal=journal, graine=12345)
+    for entrée in lire_journal(journal):
+        if "partie" in entrée:
+            résultat, coups, _, identique = rejouer(journal, entrée["partie"])
+            assert identique and coups == entrée["coups"] and résultat == entrée["résultat"], entrée["partie"]
+    print(f"{parties} parties rejouées à l'identique")
+    os.remove(journal)
+    os.rmdir(dossier)
+
+
+if __name__ == '__main__':
+    # Pour des mesures reproductibles sur des positions fixes, voir benchmark.py.
+    comparer_plateaux()
+
+    bot = negamaxv5.Negamax5("P2", "X")
 
-test_negamax(bot)
-# bot = negamaxv5.Negamax5("P1", "O")
-# test_negamax(bot)
+    test_negamax(bot)
+    # test_negamax(bot, classe_plateau=plateau_bitboard.PlateauBitboard)
+    # comparer_ordre_coups()
+    # test_mcts()
+    # comparer_simulation()
+    # test_rejouer()
+    # comparer_colonnes_gagnantes()
+    # comparer_copies()
+    # comparer_miroir()
+    # comparer_parallele(travailleurs=8)
+    # bot = negamaxv5.Negamax5("P1", "O")
+    # test_negamax(bot)
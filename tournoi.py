@@ -1,20 +1,106 @@
 import time
+import os
+import copy
+import json
+import math
+import random
+import argparse
+import importlib
+import itertools
 import concurrent.futures
+from array import array
 from moteur.partie import Partie
-from bots import bot, random_bot, negamax, negamaxv2, negamaxv3
+from bots import negamaxv5, evaluation
+from bots import statistiques as bot_statistiques
 
+# Bots du processus courant, construits une seule fois par travailleur (voir initialiser_travailleur).
+_bots = None
+_géométrie = (7, 6, 4)
+# En ligue : spécifications de tous les bots et bots déjà construits, par (indice, symbole).
+_specs = ()
+_bots_ligue = {}
 
-def une_partie(bot1, bot2, i):
-    partie = Partie()
+
+def créer_bot(spec, symbole=None):
+    """
+    Construit un bot à partir d'une spécification ("module.Classe", {paramètres}), par exemple
+    ("bots.negamaxv2.Negamax2", {"nom": "Joueur 1", "symbole": "X", "profondeur": 8}).
+    Un paramètre {"fonction": "module.nom"} (spécification relue dans un journal, voir décrire_bot) est remplacé
+    par la fonction correspondante.
+    Un bot déjà construit est renvoyé tel quel. symbole remplace celui de la spécification ou du bot (copié).
+    """
+    if not isinstance(spec, tuple):
+        if symbole is None or symbole == spec.symbole:
+            return spec
+        bot = copy.deepcopy(spec)
+        bot.symbole = symbole
+        return bot
+    chemin, paramètres = spec
+    paramètres = {clé: charger(valeur["fonction"]) if isinstance(valeur, dict) and list(valeur) == ["fonction"] else valeur
+                  for clé, valeur in paramètres.items()}
+    if symbole is not None:
+        paramètres = dict(paramètres, symbole=symbole)
+    return charger(chemin)(**paramètres)
+
+
+def charger(chemin):
+    # Objet désigné par "module.nom", par exemple une classe de bot ou une fonction d'évaluation.
+    module, nom = chemin.rsplit(".", 1)
+    return getattr(importlib.import_module(module), nom)
+
+
+def nom_du_bot(spec):
+    return spec[1].get("nom", spec[0].rsplit(".", 1)[1]) if isinstance(spec, tuple) else spec.nom
+
+
+def décrire_bot(spec):
+    """
+    Description JSON d'une spécification de bot pour le journal, de quoi reconstruire le même bot (voir rejouer).
+    Une fonction y est notée {"fonction": "module.nom"}. Un bot déjà construit ne garde pas ses paramètres :
+    il est refusé, comme tout paramètre qui ne se décrit pas en JSON.
+    """
+    if not isinstance(spec, tuple):
+        raise ValueError(f"Avec un journal, {spec.nom} doit être donné par sa spécification (voir créer_bot)")
+
+    def décrire(valeur):
+        chemin = f"{getattr(valeur, '__module__', None)}.{getattr(valeur, '__qualname__', '')}"
+        if callable(valeur) and "<" not in chemin:
+            try:
+                if charger(chemin) is valeur:
+                    return {"fonction": chemin}
+            except (ImportError, AttributeError, ValueError):
+                pass
+        raise ValueError(f"Paramètre de {nom_du_bot(spec)} impossible à enregistrer dans le journal : {valeur!r}")
+
+    return json.loads(json.dumps(list(spec), default=décrire))
+
+
+def une_partie(bot1, bot2, i, colonnes=7, lignes=6, alignement=4, durées=None, coups=None, graine=None):
+    """
+    Joue une partie, bot1 commence si i est pair. Si durées est donné ({"bot1": [], "bot2": []}),
+    la durée de chaque appel à trouver_coup y est ajoutée ; si coups est donné, les colonnes jouées.
+    Avec graine, chaque bot commence par nouvelle_partie (graine propre à chaque bot, tirée de graine) :
+    la partie est alors reproductible si les bots n'ont pas de limite de temps.
+    """
+    if graine is not None:
+        for numéro, bot in enumerate((bot1, bot2), start=1):
+            if hasattr(bot, "nouvelle_partie"):
+                bot.nouvelle_partie(f"{graine}:{numéro}")
+    partie = Partie(colonnes, lignes, alignement=alignement)
     partie.ajouter_joueur(bot1)
     partie.ajouter_joueur(bot2)
     partie.tour_joueur = i % 2 + 1
 
     while True:
+        début = time.perf_counter()
         if partie.tour_joueur == 1:
             colonne = bot1.trouver_coup(partie.plateau, bot2)
         else:
             colonne = bot2.trouver_coup(partie.plateau, bot1)
+        if durées is not None:
+            durées["bot1" if partie.tour_joueur == 1 else "bot2"].append(time.perf_counter() - début)
+        if coups is not None:
+            coups.append(colonne)
         if partie.jouer(colonne, partie.tour_joueur):
             if partie.plateau.est_nul():
                 return "nul"
@@ -25,36 +111,464 @@ def une_partie(bot1, bot2, i):
             return "bot2" if partie.tour_joueur == 1 else "bot1"
 
 
-def tournoi(bot1, bot2, parties: int, max_workers=None):
+def initialiser_travailleur(spec1, spec2, colonnes, lignes, alignement):
+    global _bots, _géométrie
+    _bots = (créer_bot(spec1), créer_bot(spec2))
+    _géométrie = (colonnes, lignes, alignement)
+
+
+def graine_de_partie(graine, i):
+    return (graine << 32) | i
+
+
+def jouer_lot(indices, graine, détails=False):
+    """
+    Joue les parties `indices` avec les bots du travailleur, chacune avec la graine graine_de_partie(graine, i).
+    Renvoie les résultats et les durées agrégés du lot, et avec détails une entrée de journal par partie.
+    """
     resultats = {"bot1": 0, "bot2": 0, "nul": 0}
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        # Notice we're NOT directly passing 'bot1' and 'bot2' here, but you can
-        # if they're pickleable. If they're not, see notes below.
-        futures = [
-            executor.submit(une_partie, bot1, bot2, i)
-            for i in range(parties)
-        ]
+    durées = {"bot1": array('d'), "bot2": array('d')}
+    entrées = []
+    for i in indices:
+        graine_partie = graine_de_partie(graine, i)
+        if not détails:
+            resultats[une_partie(*_bots, i, *_géométrie, durées=durées, graine=graine_partie)] += 1
+            continue
+        durées_partie, coups = {"bot1": [], "bot2": []}, []
+        résultat = une_partie(*_bots, i, *_géométrie, durées=durées_partie, coups=coups, graine=graine_partie)
+        # Durées dans l'ordre des coups : les deux bots jouent chacun leur tour, bot1 en premier si i est pair.
+        premier, second = (durées_partie["bot1"], durées_partie["bot2"]) if i % 2 == 0 else (durées_partie["bot2"], durées_partie["bot1"])
+        durées_coups = [round(second[k // 2] if k % 2 else premier[k // 2], 6) for k in range(len(coups))]
+        entrées.append({"partie": i, "graine": graine_partie, "résultat": résultat, "coups": coups, "durées": durées_coups})
+    return resultats, durées, entrées
+
+
+def compter_partie(resultats, durées, entrée):
+    # Ajoute une entrée du journal aux résultats et aux durées par bot.
+    resultats[entrée["résultat"]] += 1
+    premier, second = ("bot1", "bot2") if entrée["partie"] % 2 == 0 else ("bot2", "bot1")
+    for k, durée in enumerate(entrée["durées"]):
+        durées[second if k % 2 else premier].append(durée)
+
+
+def lire_journal(chemin):
+    """
+    Parcourt un journal de tournoi ligne par ligne, sans le charger en mémoire : l'en-tête {"tournoi": ...},
+    puis une entrée par partie. Une ligne incomplète (arrêt pendant l'écriture) est ignorée.
+    """
+    with open(chemin, encoding="utf-8") as fichier:
+        for ligne in fichier:
+            try:
+                yield json.loads(ligne)
+            except json.JSONDecodeError:
+                continue
+
+
+def agréger_journal(chemin):
+    """Résultats, percentiles de durée des coups et Elo de toutes les parties d'un journal."""
+    resultats = {"bot1": 0, "bot2": 0, "nul": 0}
+    durées = {"bot1": array('d'), "bot2": array('d')}
+    for entrée in lire_journal(chemin):
+        if "partie" in entrée:
+            compter_partie(resultats, durées, entrée)
+    resultats["latences"] = {clé: percentiles(valeurs) for clé, valeurs in durées.items()}
+    resultats["elo"] = elo_avec_marge(resultats["bot1"], resultats["nul"], resultats["bot2"])
+    return resultats
+
+
+def percentiles(valeurs, rangs=(50, 90, 99)):
+    """Renvoie {rang: valeur} (percentile au plus proche rang) et le maximum sous la clé "max"."""
+    triées = sorted(valeurs)
+    if not triées:
+        return {}
+    résumé = {rang: triées[min(len(triées) - 1, len(triées) * rang // 100)] for rang in rangs}
+    résumé["max"] = triées[-1]
+    return résumé
+
+
+def score_et_variance(victoires, nuls, défaites):
+    """
+    Score moyen de bot1 par partie (1 pour une victoire, 0.5 pour une nulle) et variance d'une partie.
+    Chaque résultat compte une demi-partie de plus, pour rester défini quand un bot gagne tout.
+    """
+    victoires, nuls, défaites = victoires + 0.5, nuls + 0.5, défaites + 0.5
+    n = victoires + nuls + défaites
+    score = (victoires + nuls / 2) / n
+    variance = (victoires * (1 - score) ** 2 + nuls * (0.5 - score) ** 2 + défaites * score ** 2) / n
+    return score, variance
+
+
+def score_attendu(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def différence_elo(score):
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_avec_marge(victoires, nuls, défaites, z=1.96):
+    """Différence d'Elo de bot1 sur bot2 et bornes de l'intervalle de confiance (95 % par défaut)."""
+    score, variance = score_et_variance(victoires, nuls, défaites)
+    marge = z * math.sqrt(variance / (victoires + nuls + défaites + 1.5))
+    return (différence_elo(score), différence_elo(max(score - marge, 1e-9)),
+            différence_elo(min(score + marge, 1 - 1e-9)))
 
-        for count, future in enumerate(concurrent.futures.as_completed(futures), start=1):
-            outcome = future.result()
-            resultats[outcome] += 1
 
-            # Print progress less frequently to reduce overhead
-            if count % 50 == 0:
-                print(f"Completed game {count}/{parties}")
+def distribution_contrainte(fréquences, valeurs, score):
+    """
+    Distribution la plus vraisemblable des résultats (valeurs 1, 0.5 et 0) dont le score moyen vaut `score`,
+    d'après les fréquences observées : p_i = f_i / (1 + λ (x_i - score)), λ trouvé par dichotomie.
+    """
+    écarts = [valeur - score for valeur in valeurs]
+    bas, haut = -1 / max(écarts), -1 / min(écarts)
+    for _ in range(100):
+        λ = (bas + haut) / 2
+        if sum(f * e / (1 + λ * e) for f, e in zip(fréquences, écarts)) > 0:
+            bas = λ
+        else:
+            haut = λ
+    λ = (bas + haut) / 2
+    return [f / (1 + λ * e) for f, e in zip(fréquences, écarts)]
+
+
+def llr_sprt(victoires, nuls, défaites, elo0, elo1):
+    """
+    Log du rapport de vraisemblance généralisé entre H1 (bot1 a elo1 points de plus que bot2) et H0 (elo0 points
+    de plus), pour le modèle à trois résultats (victoire, nulle, défaite).
+    """
+    n = victoires + nuls + défaites
+    if n == 0:
+        return 0.0
+    # Une demi-partie de plus par résultat : aucune fréquence nulle, sinon la distribution contrainte n'existe pas.
+    fréquences = [(nombre + 0.5) / (n + 1.5) for nombre in (victoires, nuls, défaites)]
+    valeurs = (1, 0.5, 0)
+    p0 = distribution_contrainte(fréquences, valeurs, score_attendu(elo0))
+    p1 = distribution_contrainte(fréquences, valeurs, score_attendu(elo1))
+    return n * sum(f * math.log(b / a) for f, a, b in zip(fréquences, p0, p1))
+
+
+def bornes_sprt(alpha, beta):
+    # H0 est acceptée sous la borne inférieure, H1 au-dessus de la borne supérieure.
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
 
+
+def tournoi(bot1, bot2, parties: int, max_workers=None, colonnes=7, lignes=6, alignement=4, taille_lot=None,
+            sprt=False, elo0=0, elo1=10, alpha=0.05, beta=0.05, journal=None, graine=None):
+    """
+    Joue `parties` parties entre bot1 et bot2 (bots ou spécifications, voir créer_bot), qui commencent chacun
+    une partie sur deux. Chaque travailleur construit ses bots une fois et reçoit les parties par lots.
+    Renvoie les victoires et nulles, les parties par seconde, les percentiles de durée d'un coup (en secondes)
+    et la différence d'Elo de bot1 sur bot2 avec son intervalle de confiance à 95 %.
+
+    Avec sprt, `parties` n'est qu'un maximum : le match s'arrête dès que le test séquentiel accepte H0
+    (bot1 a au plus elo0 points de plus que bot2) ou H1 (au moins elo1 points de plus), avec des risques
+    d'erreur alpha et beta. resultats["sprt"] vaut alors "H0", "H1" ou None si le maximum est atteint avant.
+
+    La partie i est jouée avec la graine graine_de_partie(graine, i) (voir une_partie), graine étant tirée au hasard
+    si elle n'est pas donnée. Avec journal (chemin d'un fichier JSONL), chaque partie terminée y est ajoutée (graine, coups,
+    résultat, durée de chaque coup) et un tournoi relancé sur le même journal ne rejoue que les parties manquantes.
+    Les bots doivent alors être des spécifications (voir décrire_bot) et les parties sont jouées une par une par lot.
+    """
+    resultats = {"bot1": 0, "bot2": 0, "nul": 0}
+    durées = {"bot1": array('d'), "bot2": array('d')}
+    en_tête = None
+    faites = set()
+    if journal is not None:
+        en_tête = {"bot1": décrire_bot(bot1), "bot2": décrire_bot(bot2), "colonnes": colonnes, "lignes": lignes,
+                   "alignement": alignement, "graine": graine}
+    if journal is not None and os.path.exists(journal):
+        for entrée in lire_journal(journal):
+            if "tournoi" in entrée:
+                if graine is None:
+                    en_tête["graine"] = graine = entrée["tournoi"]["graine"]
+                if entrée["tournoi"] != en_tête:
+                    raise ValueError(f"{journal} contient un autre tournoi : {entrée['tournoi']}")
+            elif entrée["partie"] not in faites:
+                faites.add(entrée["partie"])
+                compter_partie(resultats, durées, entrée)
+        if faites:
+            print(f"{len(faites)} parties reprises de {journal}")
+    if graine is None:
+        graine = random.getrandbits(31)
+        if en_tête is not None:
+            en_tête["graine"] = graine
+    indices = [i for i in range(parties) if i not in faites]
+
+    travailleurs = max_workers or os.cpu_count() or 1
+    if journal is not None:
+        # Une partie par lot : chaque partie est écrite dès qu'elle se termine, un arrêt ne perd que les parties en cours.
+        taille_lot = 1
+    elif taille_lot is None:
+        # Assez de lots pour équilibrer la charge entre travailleurs, assez gros pour amortir les échanges.
+        # Avec le test séquentiel, de petits lots permettent de s'arrêter plus tôt.
+        taille_lot = max(1, min(16 if sprt else 200, len(indices) // (8 * travailleurs)))
+    lots = [indices[début:début + taille_lot] for début in range(0, len(indices), taille_lot)]
+
+    fichier_journal = None
+    if journal is not None:
+        nouveau = not os.path.exists(journal) or os.path.getsize(journal) == 0
+        if not nouveau:
+            with open(journal, "rb") as fichier:
+                fichier.seek(-1, os.SEEK_END)
+                coupé = fichier.read(1) != b"\n"
+        fichier_journal = open(journal, "a", encoding="utf-8")
+        if nouveau:
+            fichier_journal.write(json.dumps({"tournoi": en_tête}, ensure_ascii=False) + "\n")
+        elif coupé:
+            # La dernière ligne a été interrompue : elle est ignorée à la lecture, la suite repart à la ligne.
+            fichier_journal.write("\n")
+        fichier_journal.flush()
+
+    borne_h0, borne_h1 = bornes_sprt(alpha, beta)
+    décision = None
+    start_time = time.perf_counter()
+    count = len(faites)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=travailleurs, initializer=initialiser_travailleur,
+                                                    initargs=(bot1, bot2, colonnes, lignes, alignement)) as executor:
+            futures = [executor.submit(jouer_lot, lot, graine, journal is not None) for lot in lots]
+            for future in concurrent.futures.as_completed(futures):
+                resultats_lot, durées_lot, entrées = future.result()
+                for clé, nombre in resultats_lot.items():
+                    resultats[clé] += nombre
+                for clé in durées:
+                    durées[clé].extend(durées_lot[clé])
+                if entrées:
+                    for entrée in entrées:
+                        fichier_journal.write(json.dumps(entrée, ensure_ascii=False, separators=(",", ":")) + "\n")
+                        compter_partie(resultats, durées, entrée)
+                    fichier_journal.flush()
+
+                # Avancement affiché à peu près tous les 10 % des parties (parties vaut 0 s'il ne reste rien à jouer).
+                nouveau_count = count + sum(resultats_lot.values()) + len(entrées)
+                if nouveau_count * 10 // max(parties, 1) != count * 10 // max(parties, 1):
+                    print(f"Completed game {nouveau_count}/{parties}")
+                count = nouveau_count
+
+                if sprt:
+                    llr = llr_sprt(resultats["bot1"], resultats["nul"], resultats["bot2"], elo0, elo1)
+                    if llr <= borne_h0 or llr >= borne_h1:
+                        décision = "H0" if llr <= borne_h0 else "H1"
+                        print(f"SPRT : {décision} acceptée après {count} parties (LLR {llr:.2f})")
+                        # Les lots déjà commencés se terminent, les autres ne sont pas joués.
+                        for future in futures:
+                            future.cancel()
+                        break
+    finally:
+        if fichier_journal is not None:
+            fichier_journal.close()
+
+    durée = time.perf_counter() - start_time
+    resultats["parties_par_seconde"] = (count - len(faites)) / durée
+    resultats["latences"] = {clé: percentiles(valeurs) for clé, valeurs in durées.items()}
+    resultats["elo"] = elo_avec_marge(resultats["bot1"], resultats["nul"], resultats["bot2"])
+    if sprt:
+        resultats["sprt"] = décision
+        resultats["llr"] = llr_sprt(resultats["bot1"], resultats["nul"], resultats["bot2"], elo0, elo1)
     return resultats
 
 
+def rejouer(journal, k, profil=None, dossier_profils="profils", statistiques=None):
+    """
+    Rejoue la partie k d'un journal avec les mêmes bots, la même géométrie et la même graine, par exemple pour
+    profiler une partie lente seule. Renvoie (résultat, coups, durées des coups, identique à la partie du journal).
+    profil ("cprofile" ou "pyinstrument") enregistre un profil par coup dans dossier_profils (voir bots/statistiques.py).
+    statistiques est un fichier JSONL où écrire les mesures de recherche de chaque coup des bots Negamax5 et dérivés.
+    """
+    en_tête, entrée = None, None
+    for ligne in lire_journal(journal):
+        if "tournoi" in ligne:
+            en_tête = ligne["tournoi"]
+        elif ligne["partie"] == k:
+            entrée = ligne
+            break
+    if en_tête is None or entrée is None:
+        raise ValueError(f"La partie {k} n'est pas dans {journal}")
+
+    bot1, bot2 = (créer_bot(tuple(en_tête[clé])) for clé in ("bot1", "bot2"))
+    mesurés = []
+    for bot_rejoué in (bot1, bot2):
+        if statistiques is not None and isinstance(bot_rejoué, negamaxv5.Negamax5) and bot_rejoué.statistiques is None:
+            mesurés.append(bot_statistiques.instrumenter(bot_rejoué))
+        if profil is not None:
+            bot_statistiques.profiler(bot_rejoué, profil, dossier_profils)
+    durées, coups = {"bot1": [], "bot2": []}, []
+    résultat = une_partie(bot1, bot2, k, en_tête["colonnes"], en_tête["lignes"], en_tête["alignement"],
+                          durées=durées, coups=coups, graine=entrée["graine"])
+    premier, second = (durées["bot1"], durées["bot2"]) if k % 2 == 0 else (durées["bot2"], durées["bot1"])
+    durées_coups = [second[n // 2] if n % 2 else premier[n // 2] for n in range(len(coups))]
+    identique = résultat == entrée["résultat"] and coups == entrée["coups"]
+    if statistiques is not None:
+        with open(statistiques, "w", encoding="utf-8") as fichier:
+            for mesures in mesurés:
+                for numéro, résumé in enumerate(mesures.historique, start=1):
+                    fichier.write(json.dumps({"bot": mesures.bot.nom, "coup": numéro, **résumé}, ensure_ascii=False) + "\n")
+    return résultat, coups, durées_coups, identique
+
+
+def initialiser_ligue(specs, colonnes, lignes, alignement):
+    global _specs, _bots_ligue, _géométrie
+    _specs = specs
+    _bots_ligue = {}
+    _géométrie = (colonnes, lignes, alignement)
+
+
+def bot_de_ligue(k, symbole):
+    # Chaque travailleur construit un bot par spécification et par symbole, au premier lot où il en a besoin.
+    bot = _bots_ligue.get((k, symbole))
+    if bot is None:
+        bot = _bots_ligue[(k, symbole)] = créer_bot(_specs[k], symbole)
+    return bot
+
+
+def jouer_lot_ligue(a, b, indices, graine):
+    """Joue les parties `indices` entre les bots a (X) et b (O) de la ligue, a commence les parties paires."""
+    bot_a, bot_b = bot_de_ligue(a, "X"), bot_de_ligue(b, "O")
+    resultats = {"bot1": 0, "bot2": 0, "nul": 0}
+    for i in indices:
+        resultats[une_partie(bot_a, bot_b, i, *_géométrie, graine=graine_de_partie(graine, i))] += 1
+    return a, b, resultats
+
+
+def bradley_terry(points, parties, itérations=10000, tolérance=1e-10):
+    """
+    Forces de Bradley-Terry à partir de points[i][j] (victoires de i contre j, une nulle comptant pour une demi)
+    et parties[i][j] (parties jouées entre i et j), par l'algorithme MM de Hunter.
+    Renvoie les classements Elo (moyenne nulle) et leurs écarts types, tirés de l'information de Fisher.
+    Chaque paire reçoit une nulle fictive, pour que les forces restent finies quand un bot gagne ou perd tout.
+    """
+    # NumPy n'est nécessaire que pour les ligues.
+    import numpy as np
+
+    parties = np.asarray(parties, dtype=np.float64)
+    jouées = parties > 0
+    points = np.asarray(points, dtype=np.float64) + 0.5 * jouées
+    parties = parties + jouées
+    victoires = points.sum(axis=1)
+    forces = np.ones(len(points))
+    for _ in range(itérations):
+        nouvelles = victoires / (parties / (forces[:, None] + forces[None, :])).sum(axis=1)
+        nouvelles /= np.exp(np.log(nouvelles).mean())
+        écart = np.abs(nouvelles - forces).max()
+        forces = nouvelles
+        if écart < tolérance:
+            break
+    θ = np.log(forces)
+    # Information de Fisher de θ : n_ij p_ij (1 - p_ij) hors diagonale, au signe près ; la pseudo-inverse
+    # donne la covariance sous la contrainte de moyenne nulle.
+    p = forces[:, None] / (forces[:, None] + forces[None, :])
+    information = -parties * p * (1 - p)
+    np.fill_diagonal(information, 0)
+    np.fill_diagonal(information, -information.sum(axis=1))
+    covariance = np.linalg.pinv(information)
+    échelle = 400 / math.log(10)
+    return échelle * (θ - θ.mean()), échelle * np.sqrt(np.clip(np.diag(covariance), 0, None))
+
+
+def ligue(specs, parties_par_paire: int, max_workers=None, colonnes=7, lignes=6, alignement=4, taille_lot=None,
+          graine=None):
+    """
+    Tournoi toutes rondes : chaque paire de bots joue `parties_par_paire` parties, en commençant chacun une
+    partie sur deux. Tous les lots de toutes les paires sont soumis ensemble au même ensemble de processus,
+    mélangés entre paires, pour que les travailleurs restent occupés jusqu'à la dernière partie.
+    Les bots (spécifications ou bots construits, voir créer_bot) reçoivent le symbole X ou O selon la paire.
+    Renvoie le classement : une liste de dictionnaires (nom, elo, marge à 95 %, points, parties), du meilleur au moins bon.
+    """
+    if graine is None:
+        graine = random.getrandbits(31)
+    n = len(specs)
+    paires = list(itertools.combinations(range(n), 2))
+    travailleurs = max_workers or os.cpu_count() or 1
+    if taille_lot is None:
+        taille_lot = max(1, min(50, len(paires) * parties_par_paire // (8 * travailleurs)))
+
+    # Les lots sont pris à tour de rôle dans chaque paire ; chaque paire a ses propres graines.
+    lots_par_paire = [[(a, b, range(début, min(début + taille_lot, parties_par_paire)), graine + numéro * parties_par_paire)
+                       for début in range(0, parties_par_paire, taille_lot)] for numéro, (a, b) in enumerate(paires)]
+    lots = [lot for tour in itertools.zip_longest(*lots_par_paire) for lot in tour if lot is not None]
+
+    points = [[0.0] * n for _ in range(n)]
+    parties = [[0] * n for _ in range(n)]
+    total = len(paires) * parties_par_paire
+    count = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=travailleurs, initializer=initialiser_ligue,
+                                                initargs=(specs, colonnes, lignes, alignement)) as executor:
+        futures = [executor.submit(jouer_lot_ligue, a, b, indices, graine_paire) for a, b, indices, graine_paire in lots]
+        for future in concurrent.futures.as_completed(futures):
+            a, b, resultats = future.result()
+            joués = sum(resultats.values())
+            points[a][b] += resultats["bot1"] + resultats["nul"] / 2
+            points[b][a] += resultats["bot2"] + resultats["nul"] / 2
+            parties[a][b] += joués
+            parties[b][a] += joués
+            if (count + joués) * 10 // total != count * 10 // total:
+                print(f"Completed game {count + joués}/{total}")
+            count += joués
+
+    elos, écarts = bradley_terry(points, parties)
+    classement = [{"nom": nom_du_bot(spec), "elo": float(elos[k]), "marge": float(1.96 * écarts[k]),
+                   "points": sum(points[k]), "parties": sum(parties[k])} for k, spec in enumerate(specs)]
+    return sorted(classement, key=lambda ligne: -ligne["elo"])
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fait jouer des bots entre eux.")
+    parser.add_argument("--ligue", action="store_true", help="tournoi toutes rondes entre les bots de LIGUE")
+    parser.add_argument("--parties", type=int, default=None, help="parties du match, ou de chaque paire en ligue")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rejouer", nargs=2, metavar=("JOURNAL", "K"), help="rejoue la partie K d'un journal de tournoi")
+    parser.add_argument("--profil", choices=("cprofile", "pyinstrument"), default=None,
+                        help="avec --rejouer, profile chaque coup des deux bots")
+    parser.add_argument("--dossier-profils", default="profils", help="dossier des profils de --profil")
+    parser.add_argument("--statistiques", default=None, metavar="FICHIER",
+                        help="avec --rejouer, écrit les mesures de recherche de chaque coup (JSONL)")
+    arguments = parser.parse_args()
 
-    # Instantiate bots
-    bot1 = negamaxv2.Negamax2("Joueur 1", "X", profondeur=8)
-    bot2 = negamaxv3.Negamax3("Joueur 2", "O", profondeur=4, temps_max=0.2)
-    #bot2 = negamaxv3.Negamax3("Joueur 2", "O", profondeur=6, temps_max=0.1)
-    #bot2 = random_bot.RandomBot("Joueur 2", "O")
-    #bot2 = bot.Bot("Joueur 2", "O")
+    if arguments.rejouer:
+        journal, k = arguments.rejouer[0], int(arguments.rejouer[1])
+        résultat, coups, durées, identique = rejouer(journal, k, arguments.profil, arguments.dossier_profils,
+                                                     arguments.statistiques)
+        for numéro, (colonne, durée) in enumerate(zip(coups, durées), start=1):
+            print(f"{numéro:3}. colonne {colonne}  {durée * 1000:8.2f} ms")
+        print(f"Résultat : {résultat}, partie {'identique à' if identique else 'différente de'} celle du journal")
+    elif arguments.ligue:
+        # Le symbole de chaque bot est fixé par la ligue.
+        LIGUE = [
+            ("bots.random_bot.RandomBot", {"nom": "Aléatoire"}),
+            ("bots.negamaxv2.Negamax2", {"nom": "Negamax2 p4", "profondeur": 4}),
+            ("bots.negamaxv3.Negamax3", {"nom": "Negamax3 0.05 s", "profondeur": 4, "temps_max": 0.05}),
+            ("bots.negamaxv5.Negamax5", {"nom": "Negamax5 p4", "profondeur": 4}),
+            ("bots.negamaxv5.Negamax5", {"nom": "Negamax5 p6 menaces", "profondeur": 6, "menaces": True,
+                                         "evaluation": evaluation.evaluation_menaces}),
+            ("bots.mcts.MCTS", {"nom": "MCTS 0.05 s", "temps_max": 0.05}),
+        ]
+        start_time = time.time()
+        classement = ligue(LIGUE, arguments.parties or 100, max_workers=arguments.workers)
+        print(f"Ligue terminée en {time.time() - start_time:.1f} secondes")
+        for rang, ligne in enumerate(classement, start=1):
+            print(f"{rang}. {ligne['nom']:<24} {ligne['elo']:+6.0f} ± {ligne['marge']:3.0f}  "
+                  f"{ligne['points']:g}/{ligne['parties']}")
+    else:
+        # Spécifications des bots : chaque travailleur les construit une fois.
+        bot1 = ("bots.negamaxv2.Negamax2", {"nom": "Joueur 1", "symbole": "X", "profondeur": 8})
+        bot2 = ("bots.negamaxv3.Negamax3", {"nom": "Joueur 2", "symbole": "O", "profondeur": 4, "temps_max": 0.2})
+        #bot2 = ("bots.negamaxv3.Negamax3", {"nom": "Joueur 2", "symbole": "O", "profondeur": 6, "temps_max": 0.1})
+        #bot2 = ("bots.solveur.Solveur", {"nom": "Joueur 2", "symbole": "O", "profondeur": 6, "cases_vides_max": 16})
+        #bot2 = ("bots.negamaxv5.Negamax5", {"nom": "Joueur 2", "symbole": "O", "profondeur": 4,
+        #                                    "evaluation": evaluation.evaluation_menaces})
+        #bot2 = ("bots.mcts.MCTS", {"nom": "Joueur 2", "symbole": "O", "temps_max": 0.2})
+        #bot2 = ("bots.random_bot.RandomBot", {"nom": "Joueur 2", "symbole": "O"})
+        #bot2 = ("bots.bot.Bot", {"nom": "Joueur 2", "symbole": "O"})
 
-    start_time = time.time()
-    resultats = tournoi(bot1, bot2, 1000)
-    print(resultats, "in", time.time() - start_time, "seconds")
+        start_time = time.time()
+        resultats = tournoi(bot1, bot2, arguments.parties or 1000, max_workers=arguments.workers)
+        # Avec un journal, un tournoi interrompu reprend là où il s'était arrêté :
+        # resultats = tournoi(bot1, bot2, 1000, journal="tournoi.jsonl")
+        # Pour comparer deux versions d'un bot : tournoi(nouveau, ancien, 20000, sprt=True, elo0=0, elo1=10).
+        latences = resultats.pop("latences")
+        elo, elo_min, elo_max = resultats.pop("elo")
+        print(resultats, "in", time.time() - start_time, "seconds")
+        print(f"Elo bot1 - bot2 : {elo:+.0f} [{elo_min:+.0f}, {elo_max:+.0f}]")
+        for clé, résumé in latences.items():
+            print(clé, ", ".join(f"p{rang} {valeur * 1000:.2f} ms" if rang != "max" else f"max {valeur * 1000:.2f} ms"
+                                 for rang, valeur in résumé.items()))